@@ -1,7 +1,20 @@
+import importlib
 import os
-from flask import Flask
+from flask import Flask, redirect
 from .config import config_by_name
-from .extensions import db, login_manager
+from .extensions import db, login_manager, cache
+
+# Blueprint registry: modules are imported one by one at registration time so
+# a failure (or profiling) can be attributed to a single blueprint, and heavy
+# modules stay out of this module's import graph.
+BLUEPRINTS = [
+    ("app.auth.routes", "auth_bp"),
+    ("app.dashboard.routes", "dashboard_bp"),
+    ("app.predict.routes", "predict_bp"),
+    ("app.reports.routes", "reports_bp"),
+    ("app.analytics.routes", "analytics_bp"),
+    ("app.about.routes", "about_bp"),
+]
 
 
 def create_app(config_name: str | None = None) -> Flask:
@@ -15,27 +28,37 @@ def create_app(config_name: str | None = None) -> Flask:
 
     db.init_app(app)
     login_manager.init_app(app)
+    cache.init_app(app)
 
-    from .auth.routes import auth_bp
-    from .dashboard.routes import dashboard_bp
-    from .predict.routes import predict_bp
-    from .reports.routes import reports_bp
-    from .analytics.routes import analytics_bp
-    from .about.routes import about_bp
+    for module_name, blueprint_name in BLUEPRINTS:
+        module = importlib.import_module(module_name)
+        app.register_blueprint(getattr(module, blueprint_name))
 
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(dashboard_bp)
-    app.register_blueprint(predict_bp)
-    app.register_blueprint(reports_bp)
-    app.register_blueprint(analytics_bp)
-    app.register_blueprint(about_bp)
+    # Build the URL matcher at startup so the first request doesn't pay
+    # rule-compilation cost
+    app.url_map.update()
+    app.url_map.bind("localhost")
 
-    @app.route("/")
-    def index():
-        from flask import redirect, url_for
+    # Uploaded images get unique random names and cached report PDFs are
+    # immutable, so browsers may hold them for a day; everything else
+    # (charts, css, js) keeps the conditional-ETag default, where repeat
+    # requests still collapse to 304s but edits show up immediately.
+    default_max_age = app.get_send_file_max_age
 
-        return redirect(url_for("dashboard.index"))
+    def _send_file_max_age(filename):
+        if filename:
+            name = filename.replace("\\", "/")
+            if "uploads/" in name or os.path.basename(name).startswith("pdf_"):
+                return 86400
+        return default_max_age(filename)
 
-    return app
+    app.get_send_file_max_age = _send_file_max_age
 
+    # The dashboard URL is fixed by its blueprint prefix, so skip the
+    # url_for walk; the Response itself is built per request because
+    # Flask mutates it during finalization (session cookie, hooks)
+    @app.route("/")
+    def index():
+        return redirect("/dashboard/")
 
+    return app
@@ -2,7 +2,7 @@ from flask import Blueprint, render_template
 
 about_bp = Blueprint('about', __name__, url_prefix='/about')
 
-@about_bp.route('/')
+@about_bp.route('/', strict_slashes=False)
 def index():
     """About us page"""
     return render_template('about/index.html')
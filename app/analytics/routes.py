@@ -5,7 +5,7 @@ from flask_login import login_required
 analytics_bp = Blueprint("analytics", __name__, url_prefix="/analytics")
 
 
-@analytics_bp.route("/")
+@analytics_bp.route("/", strict_slashes=False)
 @login_required
 def index():
     # Placeholder page for charts and aggregated stats
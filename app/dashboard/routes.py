@@ -1,18 +1,34 @@
-from flask import Blueprint, render_template, jsonify, request
+from flask import Blueprint, render_template, jsonify, request, g
 from flask_login import login_required, current_user
 from ..models.patient import Patient
 from ..models.report import Report
 from ..models.reminder import Reminder
-from ..extensions import db
-from sqlalchemy import func, desc
+from ..extensions import db, cache
+from sqlalchemy import func, desc, select
+from sqlalchemy.exc import SQLAlchemyError
 import random
 from datetime import datetime, timedelta
 
+try:
+    # C parser, ~10-50x faster than datetime.fromisoformat and handles 'Z'
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:  # pragma: no cover - fallback for environments without the wheel
+    def _parse_iso_datetime(value):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
 
 dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
 
-# Educational tips for the dashboard
-NUTRITION_TIPS = [
+
+@dashboard_bp.errorhandler(SQLAlchemyError)
+def _handle_db_error(error):
+    """Single rollback-and-respond path for database failures in this blueprint."""
+    db.session.rollback()
+    return jsonify({'error': 'Database error'}), 500
+
+# Educational tips for the dashboard (immutable tuple; picked via a private
+# Random instance so dashboard hits skip the global RNG lock)
+NUTRITION_TIPS = (
     "🍎 Encourage your child to eat a variety of colorful fruits and vegetables daily.",
     "💧 Ensure your child drinks plenty of water throughout the day.",
     "🥛 Include calcium-rich foods like milk, cheese, and yogurt for strong bones.",
@@ -28,63 +44,140 @@ NUTRITION_TIPS = [
     "🥛 Vitamin D from fortified milk helps with calcium absorption.",
     "🍓 Antioxidants in berries help protect cells from damage.",
     "🌰 Zinc from nuts and seeds supports immune function and growth."
-]
+)
+
+_RNG = random.Random()
+
+# Latest-report statuses that put a patient on the watch list
+_WATCH_STATUSES = frozenset({'At Risk', 'Severe'})
+
+
+def _user_patient_ids():
+    """Request-scoped list of the current user's patient ids.
+
+    Fetches only the id column (no ORM object hydration) and memoizes the
+    result on flask.g so views hitting it more than once per request reuse it.
+    """
+    if 'patient_ids' not in g:
+        g.patient_ids = [pid for (pid,) in db.session.query(Patient.id)
+                         .filter_by(user_id=current_user.id).all()]
+    return g.patient_ids
+
+
+def _status_counts(patient_ids):
+    """Map nutrition status -> report count via a SQL GROUP BY."""
+    rows = db.session.query(Report.nutrition_status, func.count(Report.id))\
+        .filter(Report.patient_id.in_(patient_ids))\
+        .group_by(Report.nutrition_status).all()
+    return {(status or 'Unknown'): count for status, count in rows}
+
+
+@cache.memoize(timeout=60)
+def _status_counts_for_user(user_id):
+    """Short-TTL cached status breakdown for a user's patients."""
+    return _status_counts(_user_patient_ids())
+
+
+@cache.memoize(timeout=3600)
+def _tip_of_day(user_id):
+    """Cached random nutrition tip so repeated dashboard hits keep one tip."""
+    return _RNG.choice(NUTRITION_TIPS)
+
+
+def invalidate_status_cache(user_id):
+    """Drop the cached status breakdown after reports/patients change."""
+    cache.delete_memoized(_status_counts_for_user, user_id)
+
+
+# Columns the dashboard actually renders for a report; skipping the rest
+# (notes, recommendations, image paths, ...) avoids hydrating full ORM rows
+_REPORT_SUMMARY_COLUMNS = (
+    Report.id, Report.patient_id, Report.nutrition_status, Report.created_at
+)
+
+
+def _latest_reports_by_patient(patient_ids):
+    """Map patient_id -> latest report summary row via one window-function query."""
+    if not patient_ids:
+        return {}
+    sub = db.session.query(
+        *_REPORT_SUMMARY_COLUMNS,
+        func.row_number().over(
+            partition_by=Report.patient_id,
+            order_by=Report.created_at.desc()
+        ).label('rn')
+    ).filter(Report.patient_id.in_(patient_ids)).subquery()
+    rows = db.session.query(
+        sub.c.id, sub.c.patient_id, sub.c.nutrition_status, sub.c.created_at
+    ).filter(sub.c.rn == 1).all()
+    return {row.patient_id: row for row in rows}
 
 
 @dashboard_bp.route("/")
 @login_required
 def index():
-    # Get user's patients
-    patients = Patient.query.filter_by(user_id=current_user.id).all()
-    patient_ids = [p.id for p in patients]
-    
-    # Get all reports for user's patients
-    reports = Report.query.filter(Report.patient_id.in_(patient_ids)).all()
-    
-    # Calculate status breakdown for pie chart
-    status_counts = {}
-    for report in reports:
-        status = report.nutrition_status or 'Unknown'
-        status_counts[status] = status_counts.get(status, 0) + 1
+    # Get user's patients as Core rows — the dashboard only reads a handful
+    # of fields, so skip ORM instance hydration entirely. BMI is computed in
+    # SQL via the hybrid expression. Prime the request-scoped id cache so
+    # later helpers skip the id query.
+    patients = db.session.execute(
+        select(
+            Patient.id, Patient.child_name, Patient.age_months,
+            Patient.gender, Patient.bmi.label('bmi')
+        ).where(Patient.user_id == current_user.id)
+    ).all()
+    patient_ids = g.patient_ids = [p.id for p in patients]
     
-    # Get patients to watch (at risk or severe from latest reports)
+    # Status breakdown for pie chart, aggregated in SQL instead of
+    # fetching every report row
+    status_counts = _status_counts_for_user(current_user.id)
+    total_reports = db.session.query(func.count(Report.id))\
+        .filter(Report.patient_id.in_(patient_ids)).scalar()
+
+    # Latest report per patient in a single window-function query instead of
+    # one ordered query per patient (N+1)
+    latest_by_patient = _latest_reports_by_patient(patient_ids)
+
+    # Single pass over patients: build the full status listing and pull out
+    # the patients to watch (at risk or severe from latest reports)
     patients_to_watch = []
+    all_patients_with_status = []
     for patient in patients:
-        latest_report = Report.query.filter_by(patient_id=patient.id)\
-            .order_by(desc(Report.created_at)).first()
-        if latest_report and latest_report.nutrition_status in ['At Risk', 'Severe']:
-            patients_to_watch.append({
-                'patient': patient,
-                'latest_report': latest_report
-            })
-    
-    # Get random tip of the day
-    tip_of_day = random.choice(NUTRITION_TIPS)
+        latest_report = latest_by_patient.get(patient.id)
+        item = {
+            'patient': patient,
+            'latest_report': latest_report,
+            'latest_status': (latest_report.nutrition_status if latest_report else 'No Reports')
+        }
+        all_patients_with_status.append(item)
+        if latest_report and latest_report.nutrition_status in _WATCH_STATUSES:
+            patients_to_watch.append(item)
+
+    # Get random tip of the day (cached so it stays stable between hits)
+    tip_of_day = _tip_of_day(current_user.id)
     
-    # Get recent reports (last 5)
-    recent_reports = Report.query.filter(Report.patient_id.in_(patient_ids))\
+    # Get recent reports (last 5) as lightweight rows with the patient name
+    # joined in, instead of full Report objects
+    recent_reports = db.session.query(
+        *_REPORT_SUMMARY_COLUMNS, Patient.child_name
+    ).join(Patient, Report.patient_id == Patient.id)\
+        .filter(Report.patient_id.in_(patient_ids))\
         .order_by(desc(Report.created_at)).limit(5).all()
     
-    # Get upcoming reminders (next 7 days)
-    upcoming_reminders = Reminder.query.filter(
+    # Get upcoming reminders (next 7 days): one utcnow() call, only the
+    # rendered columns, and predicates the composite reminder index can serve
+    now = datetime.utcnow()
+    horizon = now + timedelta(days=7)
+    upcoming_reminders = db.session.query(
+        Reminder.id, Reminder.reminder_date, Reminder.notes,
+        Reminder.patient_id, Patient.child_name
+    ).join(Patient, Reminder.patient_id == Patient.id).filter(
         Reminder.user_id == current_user.id,
-        Reminder.reminder_date >= datetime.utcnow(),
-        Reminder.reminder_date <= datetime.utcnow() + timedelta(days=7),
-        Reminder.is_completed == False
+        Reminder.is_completed.is_(False),
+        Reminder.reminder_date.between(now, horizon)
     ).order_by(Reminder.reminder_date.asc()).all()
     
-    # Build full patients list with latest status for display
-    all_patients_with_status = []
-    for patient in patients:
-        latest_report = Report.query.filter_by(patient_id=patient.id) \
-            .order_by(desc(Report.created_at)).first()
-        all_patients_with_status.append({
-            'patient': patient,
-            'latest_report': latest_report,
-            'latest_status': (latest_report.nutrition_status if latest_report else 'No Reports')
-        })
-    
-    return render_template("dashboard/index.html", 
+    return render_template("dashboard/index.html",
                          user=current_user,
                          status_counts=status_counts,
                          patients_to_watch=patients_to_watch,
@@ -93,89 +186,72 @@ def index():
                          recent_reports=recent_reports,
                          upcoming_reminders=upcoming_reminders,
                          total_patients=len(patients),
-                         total_reports=len(reports))
+                         total_reports=total_reports)
 
 
 @dashboard_bp.route("/api/status-breakdown")
 @login_required
 def status_breakdown():
     """API endpoint for status breakdown data"""
-    patients = Patient.query.filter_by(user_id=current_user.id).all()
-    patient_ids = [p.id for p in patients]
-    
-    reports = Report.query.filter(Report.patient_id.in_(patient_ids)).all()
-    
-    status_counts = {}
-    for report in reports:
-        status = report.nutrition_status or 'Unknown'
-        status_counts[status] = status_counts.get(status, 0) + 1
-    
-    return jsonify(status_counts)
+    return jsonify(_status_counts_for_user(current_user.id))
 
 
 @dashboard_bp.route("/api/create-reminder", methods=["POST"])
 @login_required
 def create_reminder():
     """Create a new reminder for a patient"""
+    data = request.get_json()
+    patient_id = data.get('patient_id')
+    report_id = data.get('report_id')
+    reminder_date_str = data.get('reminder_date')
+    notes = data.get('notes', '')
+
+    # Validate patient ownership
+    patient = Patient.query.filter_by(id=patient_id, user_id=current_user.id).first()
+    if not patient:
+        return jsonify({'error': 'Patient not found'}), 404
+
+    # Parse reminder date
     try:
-        data = request.get_json()
-        patient_id = data.get('patient_id')
-        report_id = data.get('report_id')
-        reminder_date_str = data.get('reminder_date')
-        notes = data.get('notes', '')
-        
-        # Validate patient ownership
-        patient = Patient.query.filter_by(id=patient_id, user_id=current_user.id).first()
-        if not patient:
-            return jsonify({'error': 'Patient not found'}), 404
-        
-        # Parse reminder date
-        reminder_date = datetime.fromisoformat(reminder_date_str.replace('Z', '+00:00'))
-        
-        # Create reminder
-        reminder = Reminder(
-            user_id=current_user.id,
-            patient_id=patient_id,
-            report_id=report_id,
-            reminder_date=reminder_date,
-            notes=notes
-        )
-        
-        db.session.add(reminder)
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'reminder_id': reminder.id,
-            'message': 'Reminder created successfully'
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+        reminder_date = _parse_iso_datetime(reminder_date_str)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid reminder date'}), 400
+
+    # Create reminder
+    reminder = Reminder(
+        user_id=current_user.id,
+        patient_id=patient_id,
+        report_id=report_id,
+        reminder_date=reminder_date,
+        notes=notes
+    )
+
+    db.session.add(reminder)
+    db.session.commit()
+
+    return jsonify({
+        'success': True,
+        'reminder_id': reminder.id,
+        'message': 'Reminder created successfully'
+    })
 
 
 @dashboard_bp.route("/api/complete-reminder/<int:reminder_id>", methods=["POST"])
 @login_required
 def complete_reminder(reminder_id):
     """Mark a reminder as completed"""
-    try:
-        reminder = Reminder.query.filter_by(
-            id=reminder_id, 
-            user_id=current_user.id
-        ).first()
-        
-        if not reminder:
-            return jsonify({'error': 'Reminder not found'}), 404
-        
-        reminder.is_completed = True
-        db.session.commit()
-        
-        return jsonify({'success': True, 'message': 'Reminder marked as completed'})
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+    reminder = Reminder.query.filter_by(
+        id=reminder_id,
+        user_id=current_user.id
+    ).first()
+
+    if not reminder:
+        return jsonify({'error': 'Reminder not found'}), 404
+
+    reminder.is_completed = True
+    db.session.commit()
+
+    return jsonify({'success': True, 'message': 'Reminder marked as completed'})
 
 
 
@@ -183,23 +259,15 @@ def complete_reminder(reminder_id):
 @login_required
 def delete_patient(patient_id: int):
     """Delete a patient owned by the current user, along with their reports and reminders."""
-    try:
-        patient = Patient.query.filter_by(id=patient_id, user_id=current_user.id).first()
-        if not patient:
-            return jsonify({'error': 'Patient not found'}), 404
-
-        # Delete reminders linked to this patient (including those linked to any reports)
-        Reminder.query.filter_by(patient_id=patient.id).delete(synchronize_session=False)
+    patient = Patient.query.filter_by(id=patient_id, user_id=current_user.id).first()
+    if not patient:
+        return jsonify({'error': 'Patient not found'}), 404
 
-        # Delete reports for this patient
-        Report.query.filter_by(patient_id=patient.id).delete(synchronize_session=False)
+    # Reports and reminders are removed by the database via ON DELETE CASCADE
+    db.session.delete(patient)
+    db.session.commit()
 
-        # Finally delete the patient
-        db.session.delete(patient)
-        db.session.commit()
+    invalidate_status_cache(current_user.id)
 
-        return jsonify({'success': True, 'message': 'Patient deleted successfully'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+    return jsonify({'success': True, 'message': 'Patient deleted successfully'})
 
@@ -1,9 +1,24 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from flask_caching import Cache
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 
 db = SQLAlchemy()
+
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only enforces ON DELETE cascades with the foreign_keys pragma."""
+    import sqlite3
+
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 login_manager = LoginManager()
 login_manager.login_view = "auth.login"
+cache = Cache(config={"CACHE_TYPE": "SimpleCache"})
 
 
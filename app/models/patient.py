@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from sqlalchemy import case
+from sqlalchemy.ext.hybrid import hybrid_property
+
 from ..extensions import db
 
 
@@ -14,13 +17,30 @@ class Patient(db.Model):
     height_cm = db.Column(db.Float, nullable=False)
     weight_kg = db.Column(db.Float, nullable=False)
 
-    reports = db.relationship("Report", backref="patient", lazy=True)
-
-    @property
+    # 'raise' surfaces accidental per-row lazy loads; load explicitly with
+    # selectinload where the collection is needed. passive_deletes lets the
+    # database cascade row removal instead of loading children into the session.
+    reports = db.relationship(
+        "Report", backref="patient", lazy="raise",
+        cascade="all, delete-orphan", passive_deletes=True,
+    )
+    reminders = db.relationship(
+        "Reminder", back_populates="patient", lazy="raise",
+        cascade="all, delete-orphan", passive_deletes=True,
+    )
+
+    @hybrid_property
     def bmi(self) -> float:
         height_m = (self.height_cm or 0) / 100.0
         if height_m <= 0:
             return 0.0
         return (self.weight_kg or 0.0) / (height_m * height_m)
 
-
+    @bmi.expression
+    def bmi(cls):
+        # SQL-side equivalent so queries can filter/order on BMI directly
+        height_m = cls.height_cm / 100.0
+        return case(
+            (cls.height_cm > 0, cls.weight_kg / (height_m * height_m)),
+            else_=0.0,
+        )
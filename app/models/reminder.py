@@ -6,18 +6,22 @@ from ..extensions import db
 
 class Reminder(db.Model):
     __tablename__ = "reminders"
+    __table_args__ = (
+        # Serves the upcoming-reminders query on the dashboard
+        db.Index("ix_reminders_user_date_completed", "user_id", "reminder_date", "is_completed"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    patient_id = db.Column(db.Integer, db.ForeignKey("patients.id"), nullable=False)
-    report_id = db.Column(db.Integer, db.ForeignKey("reports.id"), nullable=True)
+    patient_id = db.Column(db.Integer, db.ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+    report_id = db.Column(db.Integer, db.ForeignKey("reports.id", ondelete="SET NULL"), nullable=True)
     reminder_date = db.Column(db.DateTime, nullable=False)
     reminder_type = db.Column(db.String(50), default="checkup")  # checkup, follow_up, etc.
     notes = db.Column(db.Text)
     is_completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
-    # Relationships
-    user = db.relationship("User", backref="reminders")
-    patient = db.relationship("Patient", backref="reminders")
-    report = db.relationship("Report", backref="reminders")
+    # Relationships; 'raise' forces callers to opt in via selectinload
+    user = db.relationship("User", back_populates="reminders", lazy="raise")
+    patient = db.relationship("Patient", back_populates="reminders", lazy="raise")
+    report = db.relationship("Report", back_populates="reminders", lazy="raise")
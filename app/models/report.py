@@ -6,10 +6,18 @@ from ..extensions import db
 
 class Report(db.Model):
     __tablename__ = "reports"
+    __table_args__ = (
+        # Serves "latest report per patient" lookups as an index range scan
+        db.Index("ix_reports_patient_created", "patient_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    patient_id = db.Column(db.Integer, db.ForeignKey("patients.id"), nullable=False)
+    patient_id = db.Column(db.Integer, db.ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Pre-formatted YYYYMMDD of created_at, populated at insert so download
+    # filenames skip strftime; legacy rows are NULL and fall back to it
+    created_at_ymd = db.Column(
+        db.String(8), default=lambda: datetime.utcnow().strftime("%Y%m%d"))
 
     # Basic predictions
     skin_pred = db.Column(db.String(50))
@@ -42,4 +50,6 @@ class Report(db.Model):
     hydration_tips = db.Column(db.Text)
     professional_consultation = db.Column(db.Boolean, default=False)
 
+    reminders = db.relationship("Reminder", back_populates="report", lazy="raise", passive_deletes=True)
+
 
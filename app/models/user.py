@@ -15,6 +15,7 @@ class User(UserMixin, db.Model):
     role = db.Column(db.String(20), default="parent", nullable=False)
 
     patients = db.relationship("Patient", backref="owner", lazy=True)
+    reminders = db.relationship("Reminder", back_populates="user", lazy="raise")
 
     def set_password(self, password: str) -> None:
         self.password_hash = generate_password_hash(password)
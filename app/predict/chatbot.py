@@ -4,94 +4,165 @@ Provides interactive explanations and personalized recommendations
 """
 
 import re
+from collections import deque
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
 
+# Keep only the most recent exchanges; bounds memory for long sessions
+_HISTORY_MAXLEN = 100
+
+
+# Intent keyword patterns, compiled once at import time. Each maps a single
+# regex alternation to the handler method name; matching is one scan per
+# pattern instead of a substring search per keyword. Most alternatives omit
+# the trailing \b so e.g. 'recommend' still matches 'recommendations'.
+_INTENT_PATTERNS = [
+    (re.compile(r'\b(?:hello|hi|hey|start)\b'), '_get_greeting_response'),
+    (re.compile(r'\b(?:explain|what does|mean|understand|report)'), '_explain_report'),
+    (re.compile(r'\b(?:bmi|weight|height|percentile|z-score)'), '_explain_bmi'),
+    (re.compile(r'\b(?:risk|dangerous|serious|critical|level)'), '_explain_risk'),
+    (re.compile(r'\b(?:recommend|advice|what should|help|improve)'), '_provide_recommendations'),
+    (re.compile(r'\b(?:doctor|hospital|professional|consult|medical)'), '_explain_consultation'),
+    (re.compile(r'\b(?:nutrition|food|diet|healthy|eating)'), '_explain_nutrition'),
+]
+
+# All intents folded into one alternation so each message is scanned once
+# instead of once per intent; the group name carries the intent's index.
+_COMBINED_INTENTS = re.compile('|'.join(
+    f'(?P<i{index}>{pattern.pattern})'
+    for index, (pattern, _) in enumerate(_INTENT_PATTERNS)))
+
+
+def _match_intent(message: str) -> int:
+    """Index of the highest-priority intent found in one pass, or -1.
+
+    The sequential scan gave pattern-order priority (the first pattern
+    matching anywhere wins, not the leftmost keyword), so the single
+    pass keeps the lowest intent index seen across all matches.
+    """
+    best = -1
+    for match in _COMBINED_INTENTS.finditer(message):
+        index = int(match.lastgroup[1:])
+        if index == 0:
+            return 0
+        if best < 0 or index < best:
+            best = index
+    return best
+
+
+# Static UI data, built once; callers treat these as read-only
+_GREETING = (
+    "👋 Hello! I'm your NutriScan Assistant. "
+    "I can help explain your child's nutrition report and provide personalized recommendations. "
+    "What would you like to know about?"
+)
+
+_QUICK_ACTIONS = (
+    {"text": "Explain Report", "action": "explain_report"},
+    {"text": "BMI Details", "action": "explain_bmi"},
+    {"text": "Risk Assessment", "action": "explain_risk"},
+    {"text": "Get Recommendations", "action": "get_recommendations"},
+    {"text": "When to See Doctor", "action": "consultation_advice"},
+)
+
+
+def _history_entry(message: str, is_user: bool) -> Dict[str, Any]:
+    now = datetime.now()
+    return {
+        'message': message,
+        'is_user': is_user,
+        'timestamp': f"{now.hour:02d}:{now.minute:02d}"
+    }
+
 
 class MalnutritionChatbot:
-    """Interactive chatbot for explaining NutriScan reports and providing guidance"""
-    
+    """Interactive chatbot for explaining NutriScan reports and providing guidance.
+
+    Responses are computed purely from the message and the report context
+    passed in, so one instance can be shared process-wide; callers that
+    own their history (e.g. the web session) pass it explicitly and the
+    instance state stays untouched.
+    """
+
     def __init__(self):
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=_HISTORY_MAXLEN)
         self.user_context = {}
-        
+
     def add_to_history(self, message: str, is_user: bool = True):
         """Add message to conversation history"""
-        timestamp = datetime.now().strftime("%H:%M")
-        self.conversation_history.append({
-            'message': message,
-            'is_user': is_user,
-            'timestamp': timestamp
-        })
+        self.conversation_history.append(_history_entry(message, is_user))
     
     def get_greeting(self) -> str:
         """Get initial greeting message"""
-        greeting = (
-            "👋 Hello! I'm your NutriScan Assistant. "
-            "I can help explain your child's nutrition report and provide personalized recommendations. "
-            "What would you like to know about?"
-        )
-        self.add_to_history(greeting, is_user=False)
-        return greeting
+        self.add_to_history(_GREETING, is_user=False)
+        return _GREETING
     
-    def process_message(self, user_message: str, report_data: Dict[str, Any] = None) -> str:
+    def process_message(self, user_message: str, report_data: Dict[str, Any] = None,
+                        history: List[Dict[str, Any]] = None) -> str:
         """
         Process user message and generate appropriate response
-        
+
         Args:
             user_message: User's input message
             report_data: Report data for context-aware responses
-            
+            history: Caller-owned conversation history; when given, the
+                exchange is recorded there instead of on the instance
+
         Returns:
             Bot's response message
         """
-        self.add_to_history(user_message, is_user=True)
-        
-        # Store report context if provided
-        if report_data:
-            self.user_context = report_data
-        
-        # Process the message
-        response = self._generate_response(user_message.lower())
-        self.add_to_history(response, is_user=False)
-        
+        if history is not None:
+            context = report_data or {}
+        else:
+            # Legacy stateful use: context and history live on the instance
+            if report_data:
+                self.user_context = report_data
+            context = self.user_context
+            history = self.conversation_history
+
+        history.append(_history_entry(user_message, is_user=True))
+        response = self._generate_response(user_message.lower(), context)
+        history.append(_history_entry(response, is_user=False))
+        if not isinstance(history, deque):
+            del history[:-_HISTORY_MAXLEN]
+
         return response
-    
-    def _generate_response(self, message: str) -> str:
+
+    def process_messages_batch(self, messages: List[str],
+                               report_data_list: List[Dict[str, Any]]) -> List[str]:
+        """Generate responses for many (message, report context) pairs.
+
+        Cohort evaluation path: unlike process_message there is no
+        history bookkeeping (batch callers own their transcripts), each
+        message is lowered and intent-scanned exactly once, and the
+        handler for each intent is resolved a single time per call
+        instead of per message.
+        """
+        handlers = [None] * len(_INTENT_PATTERNS)
+        responses = []
+        for message, report_data in zip(messages, report_data_list):
+            context = report_data or {}
+            intent = _match_intent(message.lower())
+            if intent < 0:
+                responses.append(self._get_default_response(context))
+                continue
+            handler = handlers[intent]
+            if handler is None:
+                handler = handlers[intent] = getattr(
+                    self, _INTENT_PATTERNS[intent][1])
+            responses.append(handler(context))
+        return responses
+
+    def _generate_response(self, message: str, context: Dict[str, Any]) -> str:
         """Generate response based on user message"""
-        
-        # Greeting patterns
-        if any(word in message for word in ['hello', 'hi', 'hey', 'start']):
-            return self._get_greeting_response()
-        
-        # Report explanation patterns
-        if any(word in message for word in ['explain', 'what does', 'mean', 'understand', 'report']):
-            return self._explain_report()
-        
-        # BMI related questions
-        if any(word in message for word in ['bmi', 'weight', 'height', 'percentile', 'z-score']):
-            return self._explain_bmi()
-        
-        # Risk assessment questions
-        if any(word in message for word in ['risk', 'dangerous', 'serious', 'critical', 'level']):
-            return self._explain_risk()
-        
-        # Recommendation patterns
-        if any(word in message for word in ['recommend', 'advice', 'what should', 'help', 'improve']):
-            return self._provide_recommendations()
-        
-        # Professional consultation
-        if any(word in message for word in ['doctor', 'hospital', 'professional', 'consult', 'medical']):
-            return self._explain_consultation()
-        
-        # General nutrition questions
-        if any(word in message for word in ['nutrition', 'food', 'diet', 'healthy', 'eating']):
-            return self._explain_nutrition()
-        
+        intent = _match_intent(message)
+        if intent >= 0:
+            return getattr(self, _INTENT_PATTERNS[intent][1])(context)
+
         # Default response
-        return self._get_default_response()
+        return self._get_default_response(context)
     
-    def _get_greeting_response(self) -> str:
+    def _get_greeting_response(self, context: Dict[str, Any]) -> str:
         """Generate greeting response"""
         return (
             "👋 Great to see you! I'm here to help you understand your child's nutrition report. "
@@ -104,13 +175,13 @@ class MalnutritionChatbot:
             "What would you like me to explain first?"
         )
     
-    def _explain_report(self) -> str:
+    def _explain_report(self, context: Dict[str, Any]) -> str:
         """Explain the overall report"""
-        if not self.user_context:
+        if not context:
             return "I don't have access to a specific report yet. Please upload images and get a report first, then I can explain it to you."
         
-        patient = self.user_context.get('patient', {})
-        report = self.user_context.get('report', {})
+        patient = context.get('patient', {})
+        report = context.get('report', {})
         
         child_name = patient.get('child_name', 'your child')
         age_months = patient.get('age_months', 0)
@@ -142,13 +213,13 @@ class MalnutritionChatbot:
         
         return response
     
-    def _explain_bmi(self) -> str:
+    def _explain_bmi(self, context: Dict[str, Any]) -> str:
         """Explain BMI and related measurements"""
-        if not self.user_context:
+        if not context:
             return "I need to see a report to explain BMI details. Please get a report first."
         
-        patient = self.user_context.get('patient', {})
-        report = self.user_context.get('report', {})
+        patient = context.get('patient', {})
+        report = context.get('report', {})
         
         child_name = patient.get('child_name', 'your child')
         bmi = patient.get('bmi', 0)
@@ -186,12 +257,12 @@ class MalnutritionChatbot:
         
         return response
     
-    def _explain_risk(self) -> str:
+    def _explain_risk(self, context: Dict[str, Any]) -> str:
         """Explain risk assessment"""
-        if not self.user_context:
+        if not context:
             return "I need to see a report to explain risk levels. Please get a report first."
         
-        report = self.user_context.get('report', {})
+        report = context.get('report', {})
         risk_score = report.get('malnutrition_risk_score', 0)
         risk_level = report.get('risk_level', 'Unknown')
         
@@ -226,12 +297,12 @@ class MalnutritionChatbot:
         
         return response
     
-    def _provide_recommendations(self) -> str:
+    def _provide_recommendations(self, context: Dict[str, Any]) -> str:
         """Provide personalized recommendations"""
-        if not self.user_context:
+        if not context:
             return "I need to see a report to provide personalized recommendations. Please get a report first."
         
-        report = self.user_context.get('report', {})
+        report = context.get('report', {})
         
         response = "💡 Here are personalized recommendations based on the analysis:\n\n"
         
@@ -262,7 +333,7 @@ class MalnutritionChatbot:
         
         return response
     
-    def _explain_consultation(self) -> str:
+    def _explain_consultation(self, context: Dict[str, Any]) -> str:
         """Explain when to consult professionals"""
         response = "🏥 **When to Consult Healthcare Professionals:**\n\n"
         
@@ -287,7 +358,7 @@ class MalnutritionChatbot:
         
         return response
     
-    def _explain_nutrition(self) -> str:
+    def _explain_nutrition(self, context: Dict[str, Any]) -> str:
         """Explain general nutrition concepts"""
         response = "🥗 **General Nutrition Guidelines for Children:**\n\n"
         
@@ -310,7 +381,7 @@ class MalnutritionChatbot:
         
         return response
     
-    def _get_default_response(self) -> str:
+    def _get_default_response(self, context: Dict[str, Any]) -> str:
         """Get default response for unrecognized messages"""
         responses = [
             "I'm not sure I understood that. Could you rephrase your question?",
@@ -324,19 +395,13 @@ class MalnutritionChatbot:
     
     def get_conversation_history(self) -> List[Dict[str, Any]]:
         """Get conversation history for display"""
-        return self.conversation_history
-    
+        return list(self.conversation_history)
+
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.conversation_history.clear()
         self.user_context = {}
     
-    def get_quick_actions(self) -> List[Dict[str, str]]:
-        """Get quick action buttons for the UI"""
-        return [
-            {"text": "Explain Report", "action": "explain_report"},
-            {"text": "BMI Details", "action": "explain_bmi"},
-            {"text": "Risk Assessment", "action": "explain_risk"},
-            {"text": "Get Recommendations", "action": "get_recommendations"},
-            {"text": "When to See Doctor", "action": "consultation_advice"}
-        ]
+    def get_quick_actions(self) -> Tuple[Dict[str, str], ...]:
+        """Get quick action buttons for the UI (shared immutable tuple)"""
+        return _QUICK_ACTIONS
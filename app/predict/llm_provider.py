@@ -1,8 +1,52 @@
 from __future__ import annotations
 
 import os
+import threading
 from typing import Dict, Any, Optional
 
+# SDK clients are process-wide singletons: importing the SDKs and building
+# a client per call rebuilt the underlying HTTP connection pool each time,
+# so every chat paid a fresh TCP/TLS handshake. Double-checked locking
+# keeps the warm path to one global read.
+_openai_client = None
+_openai_lock = threading.Lock()
+_gemini_model = None
+_gemini_lock = threading.Lock()
+
+
+def _get_openai_client():
+	try:
+		global _openai_client
+		if _openai_client is None:
+			with _openai_lock:
+				if _openai_client is None:
+					from openai import OpenAI  # type: ignore
+					api_key = os.environ.get("OPENAI_API_KEY")
+					if not api_key:
+						return None
+					_openai_client = OpenAI(api_key=api_key, timeout=30, max_retries=2)
+		return _openai_client
+	except Exception:
+		return None
+
+
+def _get_gemini_model():
+	try:
+		global _gemini_model
+		if _gemini_model is None:
+			with _gemini_lock:
+				if _gemini_model is None:
+					import google.generativeai as genai  # type: ignore
+					api_key = os.environ.get("GOOGLE_API_KEY")
+					if not api_key:
+						return None
+					genai.configure(api_key=api_key)
+					_gemini_model = genai.GenerativeModel(
+						os.environ.get("GEMINI_MODEL", "gemini-1.5-flash"))
+		return _gemini_model
+	except Exception:
+		return None
+
 
 def _build_system_prompt() -> str:
 	return (
@@ -12,38 +56,42 @@ def _build_system_prompt() -> str:
 	)
 
 
+# Precompiled context block: one template render instead of building and
+# joining a per-call list of conditional f-strings
+_CTX_TEMPLATE = (
+	"Child: {child_name}\n"
+	"Age (years): {age_years:.1f}\n"
+	"BMI: {bmi:.1f} ({bmi_cat})\n"
+	"WHO Percentile: {percentile}\n"
+	"Z-Score: {z}\n"
+	"Skin: {skin_pred}\n"
+	"Nails: {nail_pred}\n"
+	"Risk Level: {risk_level}"
+)
+
+
 def _format_context(report: Dict[str, Any], patient: Dict[str, Any]) -> str:
-	child_name = patient.get("child_name") or "the child"
-	age_years = (patient.get("age_months") or 0) / 12.0
-	bmi = patient.get("bmi") or 0.0
-	skin_pred = report.get("skin_pred") or "unknown"
-	nail_pred = report.get("nail_pred") or "unknown"
-	risk_level = report.get("risk_level") or report.get("nutrition_status") or "Unknown"
-	bmi_cat = report.get("bmi_category") or "Unknown"
 	percentile = report.get("bmi_percentile")
 	z = report.get("bmi_z_score")
-
-	lines = [
-		f"Child: {child_name}",
-		f"Age (years): {age_years:.1f}",
-		f"BMI: {bmi:.1f} ({bmi_cat})",
-		f"WHO Percentile: {percentile:.1f}%" if percentile is not None else "WHO Percentile: n/a",
-		f"Z-Score: {z:.2f}" if z is not None else "Z-Score: n/a",
-		f"Skin: {skin_pred}",
-		f"Nails: {nail_pred}",
-		f"Risk Level: {risk_level}",
-	]
-	return "\n".join(lines)
+	return _CTX_TEMPLATE.format(
+		child_name=patient.get("child_name") or "the child",
+		age_years=(patient.get("age_months") or 0) / 12.0,
+		bmi=patient.get("bmi") or 0.0,
+		bmi_cat=report.get("bmi_category") or "Unknown",
+		percentile=f"{percentile:.1f}%" if percentile is not None else "n/a",
+		z=f"{z:.2f}" if z is not None else "n/a",
+		skin_pred=report.get("skin_pred") or "unknown",
+		nail_pred=report.get("nail_pred") or "unknown",
+		risk_level=report.get("risk_level") or report.get("nutrition_status") or "Unknown",
+	)
 
 
 def _openai_generate(prompt: str, temperature: float = 0.4) -> Optional[str]:
 	try:
-		from openai import OpenAI  # type: ignore
-		api_key = os.environ.get("OPENAI_API_KEY")
-		model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
-		if not api_key:
+		client = _get_openai_client()
+		if client is None:
 			return None
-		client = OpenAI(api_key=api_key)
+		model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
 		resp = client.chat.completions.create(
 			model=model,
 			messages=[
@@ -59,13 +107,9 @@ def _openai_generate(prompt: str, temperature: float = 0.4) -> Optional[str]:
 
 def _gemini_generate(prompt: str, temperature: float = 0.4) -> Optional[str]:
 	try:
-		import google.generativeai as genai  # type: ignore
-		api_key = os.environ.get("GOOGLE_API_KEY")
-		model_name = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
-		if not api_key:
+		model = _get_gemini_model()
+		if model is None:
 			return None
-		genai.configure(api_key=api_key)
-		model = genai.GenerativeModel(model_name)
 		resp = model.generate_content(
 			[
 				{"text": _build_system_prompt()},
@@ -1,88 +1,150 @@
 import os
+import queue
+import tempfile
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, make_response
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, send_file, session, stream_with_context
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
 from app.models.patient import Patient
 from app.models.report import Report
 from app.extensions import db
-from app.predict.model import get_predictor, predict_nail, predict_skin
+from app.predict.model import get_predictor, predict_batch, predict_nail, predict_skin
 from app.predict.who_standards import WHOStandards, MalnutritionRiskAssessment
 from app.predict.chatbot import MalnutritionChatbot
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+
+# matplotlib and ReportLab (~30MB of Python objects plus the font cache)
+# are imported lazily inside the chart and PDF helpers, so workers that
+# never render a chart or export a PDF skip the cost at startup
 
 predict_bp = Blueprint('predict', __name__, url_prefix='/predict')
 
+# Shared, stateless chatbot instance: responses depend only on the message
+# and report context, so building intent tables once per process is enough.
+# Per-user history lives in the session, trimmed to keep the cookie small.
+_BOT = MalnutritionChatbot()
+_CHAT_HISTORY_MAXLEN = 20
+
 UPLOAD_FOLDER = 'app/static/uploads'
 PLOTS_FOLDER = 'app/static/plots'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif'})
+
+# Accepted value ranges for the numeric form fields, checked in one pass
+_INPUT_LIMITS = (('age', 0, 18), ('height', 30, 220), ('weight', 1, 200))
 
 # Ensure directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PLOTS_FOLDER, exist_ok=True)
 
+# One worker for deferred CPU-bound rendering (matplotlib charts): the
+# request thread is freed as soon as the database work is done, and a
+# single worker keeps chart rendering from competing with request CPU
+_render_executor = ThreadPoolExecutor(max_workers=1)
+
+# Two workers for the paired upload writes; module-level so requests reuse
+# the threads instead of paying pool construction per submission
+_io_executor = ThreadPoolExecutor(max_workers=2)
+
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    # rpartition avoids the list rsplit builds; the '.' check keeps a bare
+    # "png" filename from matching its own name as an extension
+    return '.' in filename and filename.rpartition('.')[2].lower() in ALLOWED_EXTENSIONS
+
+# WHO reference curves drawn on the chart background, keyed into
+# WHOStandards.BMI_REFERENCE_DATA
+_CHART_CURVES = (
+    ('p3', 'r--', '3rd percentile (WHO)'),
+    ('p5', 'orange', '5th percentile (WHO)'),
+    ('p25', 'yellow', '25th percentile (WHO)'),
+    ('p50', 'green', '50th percentile (WHO)'),
+    ('p75', 'lightblue', '75th percentile (WHO)'),
+    ('p95', 'blue', '95th percentile (WHO)'),
+    ('p97', 'purple', '97th percentile (WHO)'),
+)
 
-def generate_bmi_chart(patient_id, height, weight, age, gender):
+# Warm figure pool, one live figure per gender: creating a Figure/Axes is
+# among matplotlib's most expensive operations (font manager, spines,
+# transforms), so the WHO reference curves, axes and grid are built once
+# and each chart just adds the patient's artists, saves, and strips them
+# again. Figures are not thread-safe, hence the per-gender lock.
+_fig_pool = {}
+_fig_pool_lock = threading.Lock()
+
+def _checkout_figure(gender):
+    """(figure, lock) for one gender's warm chart figure, built on first use."""
+    entry = _fig_pool.get(gender)
+    if entry is None:
+        with _fig_pool_lock:
+            entry = _fig_pool.get(gender)
+            if entry is None:
+                import matplotlib
+                matplotlib.use('Agg')  # Use non-interactive backend
+                import matplotlib.pyplot as plt
+                gender_data = WHOStandards.BMI_REFERENCE_DATA[gender]
+                ages = np.array(gender_data['ages'])
+                fig, ax = plt.subplots(figsize=(12, 8))
+                for key, style, label in _CHART_CURVES:
+                    ax.plot(ages, gender_data[key], style, label=label, alpha=0.7, linewidth=2)
+                ax.set_xlabel('Age (years)', fontsize=12)
+                ax.set_ylabel('BMI (kg/m²)', fontsize=12)
+                ax.grid(True, alpha=0.3)
+                ax.set_xlim(2, 19)
+                ax.set_ylim(10, 30)
+                # layout solved once here rather than per-save via bbox_inches
+                fig.tight_layout()
+                entry = _fig_pool[gender] = (fig, threading.Lock())
+    return entry
+
+def generate_bmi_chart(patient_id, height, weight, age, gender, bmi=None):
     """Generate enhanced BMI chart with WHO standards"""
     try:
-        # Calculate BMI
-        height_m = height / 100
-        bmi = weight / (height_m ** 2)
-        
-        # Get WHO data
-        gender_data = WHOStandards.BMI_REFERENCE_DATA[gender.lower()]
-        ages = np.array(gender_data['ages'])
-        
-        # Create BMI chart with proper backend
-        plt.switch_backend('Agg')  # Ensure we're using the correct backend
-        fig, ax = plt.subplots(figsize=(12, 8))
-        
-        # Plot WHO reference curves
-        ax.plot(ages, gender_data['p3'], 'r--', label='3rd percentile (WHO)', alpha=0.7, linewidth=2)
-        ax.plot(ages, gender_data['p5'], 'orange', label='5th percentile (WHO)', alpha=0.7, linewidth=2)
-        ax.plot(ages, gender_data['p25'], 'yellow', label='25th percentile (WHO)', alpha=0.7, linewidth=2)
-        ax.plot(ages, gender_data['p50'], 'green', label='50th percentile (WHO)', alpha=0.7, linewidth=2)
-        ax.plot(ages, gender_data['p75'], 'lightblue', label='75th percentile (WHO)', alpha=0.7, linewidth=2)
-        ax.plot(ages, gender_data['p95'], 'blue', label='95th percentile (WHO)', alpha=0.7, linewidth=2)
-        ax.plot(ages, gender_data['p97'], 'purple', label='97th percentile (WHO)', alpha=0.7, linewidth=2)
-        
-        # Plot patient's BMI
-        ax.scatter(age, bmi, color='red', s=150, label=f'Patient BMI: {bmi:.1f}', zorder=5)
-        
-        # Color coding based on BMI status
-        if bmi < 18.5:
-            ax.axhspan(0, 18.5, alpha=0.2, color='red', label='Underweight Zone')
-        elif bmi < 25:
-            ax.axhspan(18.5, 25, alpha=0.2, color='green', label='Normal Weight Zone')
-        else:
-            ax.axhspan(25, 35, alpha=0.2, color='orange', label='Overweight Zone')
-        
-        ax.set_xlabel('Age (years)', fontsize=12)
-        ax.set_ylabel('BMI (kg/m²)', fontsize=12)
-        ax.set_title(f'BMI-for-Age Chart - Patient {patient_id}\nWHO Growth Standards Reference', fontsize=14, fontweight='bold')
-        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        ax.grid(True, alpha=0.3)
-        ax.set_xlim(2, 19)
-        ax.set_ylim(10, 30)
-        
-        # Save chart
-        chart_path = os.path.join(PLOTS_FOLDER, f'bmi_{patient_id}.png')
-        fig.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close(fig)  # Close the figure properly
-        
+        # Callers that already know the BMI pass it in; recompute only
+        # when invoked standalone
+        if bmi is None:
+            height_m = height / 100
+            bmi = weight / (height_m ** 2)
+
+        # Check out the warm per-gender figure; only the patient dot,
+        # zone shading, title and legend are drawn per request
+        fig, lock = _checkout_figure(gender.lower())
+        with lock:
+            ax = fig.axes[0]
+
+            # Plot patient's BMI
+            ax.scatter(age, bmi, color='red', s=150, label=f'Patient BMI: {bmi:.1f}', zorder=5)
+
+            # Color coding based on BMI status
+            if bmi < 18.5:
+                ax.axhspan(0, 18.5, alpha=0.2, color='red', label='Underweight Zone')
+            elif bmi < 25:
+                ax.axhspan(18.5, 25, alpha=0.2, color='green', label='Normal Weight Zone')
+            else:
+                ax.axhspan(25, 35, alpha=0.2, color='orange', label='Overweight Zone')
+
+            ax.set_title(f'BMI-for-Age Chart - Patient {patient_id}\nWHO Growth Standards Reference', fontsize=14, fontweight='bold')
+            # Legend inside the axes: the chart's upper-left corner is clear
+            # of the reference curves, and an outside legend would need the
+            # extra bbox_inches='tight' render pass to stay in frame
+            ax.legend(loc='upper left', fontsize=9)
+
+            # Save chart. The PDF embeds this at ~6x4 inches, so dpi=100 is
+            # already more resolution than ever gets displayed — savefig cost
+            # scales roughly quadratically with dpi
+            chart_path = os.path.join(PLOTS_FOLDER, f'bmi_{patient_id}.png')
+            fig.savefig(chart_path, dpi=100)
+
+            # Strip the per-patient artists so the next checkout starts
+            # from the bare reference curves
+            for coll in list(ax.collections):
+                coll.remove()
+            for patch in list(ax.patches):
+                patch.remove()
+            if ax.legend_ is not None:
+                ax.legend_.remove()
+
         return f'bmi_{patient_id}.png'
     except Exception as e:
         print(f"Error generating BMI chart: {e}")
@@ -90,6 +152,26 @@ def generate_bmi_chart(patient_id, height, weight, age, gender):
         traceback.print_exc()
         return None
 
+def _pdf_thumb_path(image_path):
+    root, _ = os.path.splitext(image_path)
+    return root + '_thumb.jpg'
+
+def _save_pdf_thumbnail(image_path):
+    """Write a small JPEG beside an upload for PDF embedding.
+
+    The PDF renders uploads at 3x2 inches, so embedding the original
+    multi-megapixel capture just bloats the document and the build time;
+    an 800px LANCZOS thumbnail is indistinguishable at that size.
+    """
+    try:
+        from PIL import Image as PILImage
+        im = PILImage.open(image_path)
+        im.thumbnail((800, 800), PILImage.LANCZOS)
+        im.convert('RGB').save(_pdf_thumb_path(image_path), 'JPEG',
+                               quality=82, optimize=True)
+    except Exception as e:
+        print(f"Error creating PDF thumbnail: {e}")
+
 def determine_severity(prediction, confidence):
     """Determine severity level based on prediction and confidence"""
     if 'unhealthy' in prediction:
@@ -112,12 +194,15 @@ def simple_image_heuristic(image_path):
         from PIL import Image
         import numpy as np
         
-        img = Image.open(image_path).convert('HSV')
-        img_array = np.array(img)
-        
-        # Analyze saturation and value channels
-        avg_saturation = np.mean(img_array[:, :, 1])
-        avg_value = np.mean(img_array[:, :, 2])
+        # Thumbnail first: the channel means are statistically the same at
+        # 256px but the HSV conversion and reduction touch ~100x fewer
+        # pixels on multi-megapixel uploads
+        img = Image.open(image_path)
+        img.thumbnail((256, 256), Image.BILINEAR)
+        img_array = np.asarray(img.convert('HSV'))
+
+        # Analyze saturation and value channels in one pass
+        avg_saturation, avg_value = img_array[:, :, 1:3].reshape(-1, 2).mean(axis=0)
         
         # Simple rules for health assessment
         if avg_saturation < 50 and avg_value < 100:
@@ -158,8 +243,9 @@ def predict():
             height = float(height_val)
             weight = float(weight_val)
             
-            # Validate inputs
-            if age < 0 or age > 18 or height < 30 or height > 220 or weight < 1 or weight > 200:
+            # Validate inputs against the range table in one pass
+            values = {'age': age, 'height': height, 'weight': weight}
+            if any(not lo <= values[name] <= hi for name, lo, hi in _INPUT_LIMITS):
                 flash('Invalid input values. Please check age, height, and weight.', 'error')
                 return render_template('predict/form.html')
             
@@ -188,28 +274,51 @@ def predict():
                 height_cm=height,
                 weight_kg=weight
             )
+            # Flush (not commit) so patient.id is assigned while keeping
+            # patient and report in one transaction: a single fsync per
+            # prediction, and no orphaned Patient row if anything below fails
             db.session.add(patient)
-            db.session.commit()
-            
-            # Save uploaded images
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
-            
-            skin_filename = f"skin_{patient.id}_{timestamp}_{secure_filename(skin_file.filename)}"
-            nail_filename = f"nail_{patient.id}_{timestamp}_{secure_filename(nail_file.filename)}"
+            db.session.flush()
+
+            # Save uploaded images under random names: uuid4().hex is one
+            # getrandom() call (no strftime, no secure_filename regex over
+            # user input) and collision-safe across workers, and the
+            # extensions were already validated by allowed_file above
+            skin_ext = skin_file.filename.rpartition('.')[2].lower()
+            nail_ext = nail_file.filename.rpartition('.')[2].lower()
+            skin_filename = f"skin_{patient.id}_{uuid.uuid4().hex}.{skin_ext}"
+            nail_filename = f"nail_{patient.id}_{uuid.uuid4().hex}.{nail_ext}"
             
             skin_path = os.path.join(UPLOAD_FOLDER, skin_filename)
             nail_path = os.path.join(UPLOAD_FOLDER, nail_filename)
             
-            skin_file.save(skin_path)
-            nail_file.save(nail_path)
+            # Write both uploads (and their PDF thumbnails) in parallel:
+            # fwrite releases the GIL, so the two disk writes overlap and
+            # the save step costs roughly one file's latency
+            def _persist(upload, path):
+                upload.save(path)
+                _save_pdf_thumbnail(path)
+
+            for fut in [_io_executor.submit(_persist, skin_file, skin_path),
+                        _io_executor.submit(_persist, nail_file, nail_path)]:
+                fut.result()
             
-            # Generate enhanced BMI chart
-            bmi_chart = generate_bmi_chart(patient.id, height, weight, age, gender)
+            # BMI is a computed hybrid property; evaluate it once here and
+            # thread the local through the chart, WHO lookups and report
+            bmi = patient.bmi
+
+            # Generate enhanced BMI chart off the request thread; the
+            # filename is deterministic so nothing downstream needs the
+            # render to finish first
+            bmi_chart = f'bmi_{patient.id}.png'
+            _render_executor.submit(generate_bmi_chart, patient.id, height,
+                                    weight, age, gender, bmi)
             
-            # Get predictions using pretrained CNN feature extractors
+            # Get predictions using pretrained CNN feature extractors;
+            # both images share one stacked forward pass
             try:
-                skin_pred, skin_conf = predict_skin(skin_path)
-                nail_pred, nail_conf = predict_nail(nail_path)
+                (skin_pred, skin_conf), (nail_pred, nail_conf) = \
+                    predict_batch([skin_path, nail_path])
             except Exception as e:
                 print(f"Error with pretrained models: {e}")
                 # Fallback to heuristic
@@ -217,7 +326,6 @@ def predict():
                 nail_pred, nail_conf = simple_image_heuristic(nail_path)
             
             # Calculate WHO standards
-            bmi = patient.bmi
             try:
                 bmi_percentile, bmi_z_score = WHOStandards.calculate_bmi_percentile_and_zscore(age, bmi, gender)
                 bmi_category = WHOStandards.get_bmi_category(bmi, age, gender)
@@ -256,7 +364,7 @@ def predict():
                 nutrition_status = "Normal"
             
             # Create comprehensive report
-            notes = f"BMI chart: {bmi_chart}" if bmi_chart else None
+            notes = f"BMI chart: {bmi_chart}"
             report = Report(
                 patient_id=patient.id,
                 skin_pred=skin_pred,
@@ -289,13 +397,18 @@ def predict():
             )
             db.session.add(report)
             db.session.commit()
-            
+
+            # New report changes the dashboard status breakdown
+            from app.dashboard.routes import invalidate_status_cache
+            invalidate_status_cache(current_user.id)
+
             return redirect(url_for('predict.result', report_id=report.id))
             
         except Exception as e:
+            db.session.rollback()
             flash(f'Error processing prediction: {str(e)}', 'error')
             return render_template('predict/form.html')
-    
+
     return render_template('predict/form.html')
 
 @predict_bp.route('/result/<int:report_id>')
@@ -327,9 +440,6 @@ def chatbot():
         if not message:
             return jsonify({'error': 'Message is required'}), 400
         
-        # Initialize chatbot
-        bot = MalnutritionChatbot()
-        
         # Get report context if provided
         report_data = None
         if report_id:
@@ -362,12 +472,14 @@ def chatbot():
                 }
             }
         
-        # Process message
-        response = bot.process_message(message, report_data)
-        
+        # Process message against the shared bot, keeping history in the session
+        history = session.get('chat_history', [])
+        response = _BOT.process_message(message, report_data, history=history)
+        session['chat_history'] = history[-_CHAT_HISTORY_MAXLEN:]
+
         return jsonify({
             'response': response,
-            'conversation_history': bot.get_conversation_history()
+            'conversation_history': session['chat_history']
         })
         
     except Exception as e:
@@ -391,66 +503,277 @@ def export_pdf(report_id):
         if patient.user_id != current_user.id:
             flash('Access denied.', 'error')
             return redirect(url_for('dashboard.index'))
-        
-        # Create PDF
-        response = make_response()
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename=nutriscan_report_{patient.child_name}_{report.created_at.strftime("%Y%m%d")}.pdf'
-        
-        # Generate PDF content
-        pdf_content = generate_pdf_report(report, patient)
-        response.data = pdf_content
-        
+
+        # Pre-formatted date column; strftime only for pre-migration rows
+        ymd = report.created_at_ymd or report.created_at.strftime("%Y%m%d")
+        download_name = f'nutriscan_report_{patient.child_name}_{ymd}.pdf'
+
+        # Reports are immutable once created, so a built PDF can be
+        # cached on disk forever; repeat downloads skip ReportLab
+        # entirely and get range/If-Modified-Since support for free
+        # absolute: send_file resolves relative paths against app.root_path
+        cache_path = os.path.abspath(os.path.join(PLOTS_FOLDER, f'pdf_{report_id}.pdf'))
+        if os.path.exists(cache_path):
+            return send_file(cache_path, mimetype='application/pdf',
+                             as_attachment=True, download_name=download_name,
+                             conditional=True, max_age=86400)
+
+        # First download: stream the PDF as ReportLab emits it. A builder
+        # thread writes into a queue-backed file-like, so peak memory
+        # stays one chunk instead of the whole document and the download
+        # starts as soon as the first page is rendered, while a tee into
+        # a temp file populates the cache. The ORM rows are fully loaded
+        # here, so the builder thread never touches the session.
+        def generate():
+            chunks = queue.Queue()
+
+            class _TeeWriter:
+                def __init__(self, sink):
+                    self._sink = sink
+
+                def write(self, data):
+                    if data:
+                        data = bytes(data)
+                        self._sink.write(data)
+                        chunks.put(data)
+                    return len(data)
+
+                def flush(self):
+                    self._sink.flush()
+
+            def build():
+                # Per-build temp name: concurrent first downloads each
+                # write their own file, and whichever finishes last wins
+                # the atomic replace — never an interleaved cache entry
+                tmp_fd, tmp_path = tempfile.mkstemp(
+                    dir=PLOTS_FOLDER, prefix=f'pdf_{report_id}_', suffix='.part')
+                try:
+                    with os.fdopen(tmp_fd, 'wb') as sink:
+                        generate_pdf_report(report, patient, _TeeWriter(sink))
+                    os.replace(tmp_path, cache_path)
+                except BaseException as exc:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    # Surface the failure through the queue: the stream
+                    # must abort rather than end as a truncated 200
+                    chunks.put(exc)
+                else:
+                    chunks.put(None)
+
+            threading.Thread(target=build, daemon=True).start()
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                yield chunk
+
+        response = Response(stream_with_context(generate()), mimetype='application/pdf')
+        response.headers['Content-Disposition'] = f'attachment; filename={download_name}'
         return response
         
     except Exception as e:
         flash(f'Error generating PDF: {str(e)}', 'error')
         return redirect(url_for('predict.result', report_id=report_id))
 
-def generate_pdf_report(report, patient):
-    """Generate comprehensive PDF report using ReportLab with all content from result.html"""
-    from io import BytesIO
-    import os
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    
-    # Get styles
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#007bff')
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        spaceAfter=12,
-        textColor=colors.HexColor('#495057')
-    )
-    
-    subheading_style = ParagraphStyle(
-        'CustomSubHeading',
-        parent=styles['Heading3'],
-        fontSize=14,
-        spaceAfter=8,
-        textColor=colors.HexColor('#6c757d')
+@lru_cache(maxsize=1)
+def _label_table_cmds():
+    """Shared commands for the two-column label/value tables in the PDF.
+
+    The seven inline TableStyle([...]) constructions differed only in the
+    label column's background tint; built lazily so importing this module
+    does not pull in ReportLab.
+    """
+    from reportlab.lib import colors
+    return (
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (1, 0), (1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
     )
-    
+
+
+# One immutable TableStyle per label tint, built on first use and shared
+# across every PDF render instead of re-parsing the command list per table
+_label_table_styles = {}
+
+
+def _labeled_table(data, header_bg, col_widths=None):
+    """Build a label/value Table with a tinted label column and cached style."""
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table, TableStyle
+    style = _label_table_styles.get(header_bg)
+    if style is None:
+        style = _label_table_styles[header_bg] = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor(header_bg)),
+            *_label_table_cmds(),
+        ])
+    table = Table(data, colWidths=list(col_widths or (2 * inch, 3 * inch)))
+    table.setStyle(style)
+    return table
+
+
+# Canned finding bullets for the PDF, frozen once at import. Kept as text
+# rather than prebuilt Paragraph flowables: platypus mutates flowables
+# during build, so sharing Paragraphs across concurrent exports is unsafe.
+_SKIN_UNHEALTHY_FINDINGS = (
+    "• Texture or color patterns suggest potential nutritional or dermatologic concern.",
+    "• Consider hydration optimization and review for micronutrient gaps (vitamin A/E, zinc).",
+    "• If persistent for >2 weeks or symptomatic (itching, pain), seek clinician review."
+)
+_SKIN_HEALTHY_FINDINGS = (
+    "• No suspicious lesions or dyschromia detected by the model.",
+    "• Maintain sun protection and routine moisturization."
+)
+_NAIL_UNHEALTHY_FINDINGS = (
+    "• Surface features may reflect iron/protein deficiency or mechanical trauma.",
+    "• Check for brittleness, discoloration, or periungual swelling over the next weeks.",
+    "• Discuss diet rich in iron, protein, biotin; seek care if changes progress."
+)
+_NAIL_HEALTHY_FINDINGS = (
+    "• Color and attachment appear within expected range.",
+    "• Maintain trimming hygiene; avoid prolonged moisture exposure."
+)
+
+
+# ImageReader cache keyed by path and invalidated on mtime change, so a
+# file embedded in several PDFs (e.g. a patient's BMI chart across report
+# exports) is decoded once instead of per build
+_image_readers = {}
+
+
+def _cached_image(path, width, height):
+    """Image flowable backed by a shared, mtime-validated ImageReader.
+
+    PNG sources (the BMI chart) are transcoded once to an in-memory JPEG:
+    ReportLab passes JPEG streams straight into the document (DCTDecode)
+    but must zlib-compress the raw pixels of any other format on every
+    build, which dominates doc.build for a 1200x800 chart.
+    """
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import Image
+    mtime = os.path.getmtime(path)
+    cached = _image_readers.get(path)
+    if cached is None or cached[0] != mtime:
+        source = path
+        if path.lower().endswith('.png'):
+            import io
+            from PIL import Image as PILImage
+            buf = io.BytesIO()
+            PILImage.open(path).convert('RGB').save(buf, 'JPEG', quality=85)
+            buf.seek(0)
+            source = buf
+        cached = _image_readers[path] = (mtime, ImageReader(source))
+    img = Image(path, width=width, height=height)
+    # The flowable builds its reader lazily from the path; hand it the
+    # cached one up front so layout and draw skip the decode
+    img._img = cached[1]
+    return img
+
+
+@lru_cache(maxsize=1)
+def _image_summary_style():
+    """Static header-row style for the image summary table, built once."""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (1, 1), (1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ])
+
+
+@lru_cache(maxsize=1)
+def _sample_styles():
+    """Process-wide ReportLab sample stylesheet (registration is not cheap)."""
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=1)
+def _pdf_styles():
+    """Custom ParagraphStyles and colors for the report, built once.
+
+    Every export used to re-parse the hex colors and rebuild these style
+    objects; they are constants, so hoist them behind a cache. Flowables
+    themselves (Paragraphs, Tables) are deliberately not cached: platypus
+    stores layout state on them during build, so sharing them between
+    concurrent exports would corrupt output.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle
+
+    styles = _sample_styles()
+    assessment_bg = colors.HexColor('#f8f9fa')
+
+    def assessment(hex_color):
+        color = colors.HexColor(hex_color)
+        return ParagraphStyle(
+            'Assessment', parent=styles['Normal'], fontSize=10,
+            textColor=color, backColor=assessment_bg,
+            borderColor=color, borderWidth=1, borderPadding=10)
+
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle', parent=styles['Heading1'], fontSize=24,
+            spaceAfter=30, alignment=TA_CENTER,
+            textColor=colors.HexColor('#007bff')),
+        'heading': ParagraphStyle(
+            'CustomHeading', parent=styles['Heading2'], fontSize=16,
+            spaceAfter=12, textColor=colors.HexColor('#495057')),
+        'subheading': ParagraphStyle(
+            'CustomSubHeading', parent=styles['Heading3'], fontSize=14,
+            spaceAfter=8, textColor=colors.HexColor('#6c757d')),
+        'subtitle': ParagraphStyle(
+            'Subtitle', parent=styles['Normal'], fontSize=12,
+            alignment=TA_CENTER, textColor=colors.grey),
+        'footer': ParagraphStyle(
+            'Footer', parent=styles['Normal'], fontSize=8,
+            alignment=TA_CENTER, textColor=colors.grey),
+        # One assessment style per severity tier: both areas flagged,
+        # one flagged, none flagged
+        'assessment_both': assessment('#856404'),
+        'assessment_one': assessment('#0c5460'),
+        'assessment_none': assessment('#155724'),
+    }
+
+
+def generate_pdf_report(report, patient, outfile):
+    """Generate comprehensive PDF report using ReportLab with all content from result.html.
+
+    Writes into the given file-like object as pages are rendered.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+    doc = SimpleDocTemplate(outfile, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+
+    # Get styles (shared stylesheet and custom styles, built once per process)
+    styles = _sample_styles()
+    pdf_styles = _pdf_styles()
+    title_style = pdf_styles['title']
+    heading_style = pdf_styles['heading']
+    subheading_style = pdf_styles['subheading']
+
     # Build PDF content
     story = []
-    
+
     # Title
     story.append(Paragraph("NutriScan Malnutrition Analysis Report", title_style))
-    story.append(Paragraph("Comprehensive malnutrition analysis with WHO standards and AI-powered insights", 
-                          ParagraphStyle('Subtitle', parent=styles['Normal'], fontSize=12, alignment=TA_CENTER, textColor=colors.grey)))
+    story.append(Paragraph("Comprehensive malnutrition analysis with WHO standards and AI-powered insights",
+                          pdf_styles['subtitle']))
     story.append(Spacer(1, 20))
     
     # Risk Assessment Overview
@@ -461,6 +784,7 @@ def generate_pdf_report(report, patient):
     risk_score = report.malnutrition_risk_score or 0
     bmi_percentile = report.bmi_percentile or 50
     bmi_z_score = report.bmi_z_score or 0
+    bmi = patient.bmi  # hybrid property: divide once, format thrice
     
     risk_data = [
         ['Risk Level:', risk_level],
@@ -469,17 +793,7 @@ def generate_pdf_report(report, patient):
         ['Z-Score:', f"{bmi_z_score:.2f}"]
     ]
     
-    risk_table = Table(risk_data, colWidths=[2*inch, 3*inch])
-    risk_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#fff3cd')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    risk_table = _labeled_table(risk_data, '#fff3cd')
     
     story.append(risk_table)
     story.append(Spacer(1, 20))
@@ -499,21 +813,11 @@ def generate_pdf_report(report, patient):
         ['Age:', f"{patient.age_months / 12:.1f} years ({patient.age_months} months)"],
         ['Height:', f"{patient.height_cm:.1f} cm"],
         ['Weight:', f"{patient.weight_kg:.1f} kg"],
-        ['BMI:', f"{patient.bmi:.2f}"],
+        ['BMI:', f"{bmi:.2f}"],
         ['BMI Category:', report.bmi_category or 'Unknown']
     ]
     
-    patient_table = Table(patient_data, colWidths=[2*inch, 3*inch])
-    patient_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f8f9fa')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    patient_table = _labeled_table(patient_data, '#f8f9fa')
     
     story.append(patient_table)
     story.append(Spacer(1, 20))
@@ -533,26 +837,20 @@ def generate_pdf_report(report, patient):
         ['Confidence:', f"{skin_confidence:.1f}%"]
     ]
     
-    skin_table = Table(skin_data, colWidths=[2*inch, 3*inch])
-    skin_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f8d7da')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    skin_table = _labeled_table(skin_data, '#f8d7da')
     
     story.append(skin_table)
     
     # Add skin image if available
     if report.skin_image_path:
         skin_image_path = os.path.join('app', 'static', 'uploads', report.skin_image_path)
+        # Prefer the pre-shrunk thumbnail; older reports fall back to the original
+        skin_thumb = _pdf_thumb_path(skin_image_path)
+        if os.path.exists(skin_thumb):
+            skin_image_path = skin_thumb
         if os.path.exists(skin_image_path):
             try:
-                skin_img = Image(skin_image_path, width=3*inch, height=2*inch)
+                skin_img = _cached_image(skin_image_path, width=3*inch, height=2*inch)
                 story.append(Spacer(1, 10))
                 story.append(skin_img)
             except:
@@ -572,26 +870,19 @@ def generate_pdf_report(report, patient):
         ['Confidence:', f"{nail_confidence:.1f}%"]
     ]
     
-    nail_table = Table(nail_data, colWidths=[2*inch, 3*inch])
-    nail_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#d4edda')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    nail_table = _labeled_table(nail_data, '#d4edda')
     
     story.append(nail_table)
     
     # Add nail image if available
     if report.nail_image_path:
         nail_image_path = os.path.join('app', 'static', 'uploads', report.nail_image_path)
+        nail_thumb = _pdf_thumb_path(nail_image_path)
+        if os.path.exists(nail_thumb):
+            nail_image_path = nail_thumb
         if os.path.exists(nail_image_path):
             try:
-                nail_img = Image(nail_image_path, width=3*inch, height=2*inch)
+                nail_img = _cached_image(nail_image_path, width=3*inch, height=2*inch)
                 story.append(Spacer(1, 10))
                 story.append(nail_img)
             except:
@@ -607,7 +898,7 @@ def generate_pdf_report(report, patient):
     plot_path = os.path.join('app', 'static', 'plots', plot_filename)
     if os.path.exists(plot_path):
         try:
-            bmi_chart = Image(plot_path, width=6*inch, height=4*inch)
+            bmi_chart = _cached_image(plot_path, width=6*inch, height=4*inch)
             story.append(bmi_chart)
         except:
             story.append(Paragraph("BMI chart not available", styles['Normal']))
@@ -616,23 +907,13 @@ def generate_pdf_report(report, patient):
     
     # WHO Standards Summary
     who_summary_data = [
-        ['Your Child\'s BMI:', f"{patient.bmi:.1f}"],
+        ['Your Child\'s BMI:', f"{bmi:.1f}"],
         ['WHO Percentile:', f"{bmi_percentile:.1f}%"],
         ['Z-Score:', f"{bmi_z_score:.2f}"],
         ['Category:', report.bmi_category or 'Unknown']
     ]
     
-    who_summary_table = Table(who_summary_data, colWidths=[2*inch, 3*inch])
-    who_summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#d1ecf1')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    who_summary_table = _labeled_table(who_summary_data, '#d1ecf1')
     
     story.append(Spacer(1, 15))
     story.append(who_summary_table)
@@ -677,17 +958,7 @@ def generate_pdf_report(report, patient):
         ['Report ID:', f"SKN-{patient.id:04d}-{report.id:04d}"]
     ]
     
-    report_metadata_table = Table(report_metadata, colWidths=[2*inch, 3*inch])
-    report_metadata_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e9ecef')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    report_metadata_table = _labeled_table(report_metadata, '#e9ecef')
     
     story.append(report_metadata_table)
     story.append(Spacer(1, 15))
@@ -701,16 +972,7 @@ def generate_pdf_report(report, patient):
     ]
     
     image_summary_table = Table(image_summary_data, colWidths=[2*inch, 4*inch])
-    image_summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 1), (1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    image_summary_table.setStyle(_image_summary_style())
     
     story.append(image_summary_table)
     story.append(Spacer(1, 15))
@@ -724,73 +986,41 @@ def generate_pdf_report(report, patient):
     
     # Skin findings
     story.append(Paragraph("Skin Health Findings:", styles['Normal']))
-    if skin_unhealthy:
-        skin_findings = [
-            "• Texture or color patterns suggest potential nutritional or dermatologic concern.",
-            "• Consider hydration optimization and review for micronutrient gaps (vitamin A/E, zinc).",
-            "• If persistent for >2 weeks or symptomatic (itching, pain), seek clinician review."
-        ]
-    else:
-        skin_findings = [
-            "• No suspicious lesions or dyschromia detected by the model.",
-            "• Maintain sun protection and routine moisturization."
-        ]
-    
-    for finding in skin_findings:
-        story.append(Paragraph(finding, styles['Normal']))
-    
+    skin_findings = _SKIN_UNHEALTHY_FINDINGS if skin_unhealthy else _SKIN_HEALTHY_FINDINGS
+    story.extend(Paragraph(finding, styles['Normal']) for finding in skin_findings)
+
     story.append(Spacer(1, 10))
-    
+
     # Nail findings
     story.append(Paragraph("Nail Health Findings:", styles['Normal']))
-    if nail_unhealthy:
-        nail_findings = [
-            "• Surface features may reflect iron/protein deficiency or mechanical trauma.",
-            "• Check for brittleness, discoloration, or periungual swelling over the next weeks.",
-            "• Discuss diet rich in iron, protein, biotin; seek care if changes progress."
-        ]
-    else:
-        nail_findings = [
-            "• Color and attachment appear within expected range.",
-            "• Maintain trimming hygiene; avoid prolonged moisture exposure."
-        ]
-    
-    for finding in nail_findings:
-        story.append(Paragraph(finding, styles['Normal']))
-    
+    nail_findings = _NAIL_UNHEALTHY_FINDINGS if nail_unhealthy else _NAIL_HEALTHY_FINDINGS
+    story.extend(Paragraph(finding, styles['Normal']) for finding in nail_findings)
+
     story.append(Spacer(1, 15))
     
     # Overall assessment
     if skin_unhealthy and nail_unhealthy:
         assessment_text = "Combined skin and nail findings increase the likelihood of nutritional imbalance. Review dietary intake, hydration, and consider clinician follow-up."
-        assessment_color = colors.HexColor('#856404')
+        assessment_style = pdf_styles['assessment_both']
     elif skin_unhealthy or nail_unhealthy:
         assessment_text = "One area shows abnormalities. Monitor 2–4 weeks and reinforce diet, sleep, hydration, and hygiene. Escalate if symptoms worsen."
-        assessment_color = colors.HexColor('#0c5460')
+        assessment_style = pdf_styles['assessment_one']
     else:
         assessment_text = "Skin and nail findings are within normal limits. Continue healthy routines and periodic monitoring."
-        assessment_color = colors.HexColor('#155724')
-    
-    story.append(Paragraph(assessment_text, 
-                          ParagraphStyle('Assessment', parent=styles['Normal'], 
-                                       fontSize=10, textColor=assessment_color, 
-                                       backColor=colors.HexColor('#f8f9fa'),
-                                       borderColor=assessment_color,
-                                       borderWidth=1,
-                                       borderPadding=10)))
-    
+        assessment_style = pdf_styles['assessment_none']
+
+    story.append(Paragraph(assessment_text, assessment_style))
+
     story.append(Spacer(1, 20))
-    
+
     # Footer
     story.append(Spacer(1, 30))
     story.append(Paragraph(
         f"Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} by NutriScan AI",
-        ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, alignment=TA_CENTER, textColor=colors.grey)
+        pdf_styles['footer']
     ))
     
     # Build PDF
     doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
 
 
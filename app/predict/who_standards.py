@@ -5,8 +5,34 @@ based on World Health Organization standards.
 """
 
 import numpy as np
+from functools import lru_cache
 from typing import Tuple, Dict, Any
 
+try:
+    # C implementation of the inverse normal CDF
+    from scipy.special import ndtri as _inv_norm_cdf
+except ImportError:  # pragma: no cover - stdlib fallback without scipy
+    from statistics import NormalDist
+
+    _inv_norm_cdf = NormalDist().inv_cdf
+
+# Percentile levels matching the p3..p97 rows of BMI_REFERENCE_DATA;
+# the tuple is for the scalar path, the array for vectorized batches
+_PCTL_LEVELS_SCALAR = (3.0, 5.0, 10.0, 25.0, 50.0, 75.0, 90.0, 95.0, 97.0)
+_PCTL_LEVELS = np.array(_PCTL_LEVELS_SCALAR)
+
+# BMI category bins over WHO percentile: <5 Underweight, <85 Normal,
+# <97 Overweight, else Obese; searchsorted side='right' reproduces the
+# strict < comparisons of the scalar ladder
+_CATEGORY_THRESH = np.array([5.0, 85.0, 97.0])
+_CATEGORY_LABELS = np.array(["Underweight", "Normal", "Overweight", "Obese"])
+
+# Dense age grid the reference curves are resampled onto at import, so a
+# lookup is one index computation instead of an argmin over the age list
+_AGE_GRID_START = 2.0
+_AGE_GRID_STEP = 0.1
+_AGE_GRID = np.arange(2.0, 19.0 + 1e-9, _AGE_GRID_STEP)
+
 
 class WHOStandards:
     """WHO growth standards for children and adolescents (2-19 years)"""
@@ -53,48 +79,136 @@ class WHOStandards:
         Returns:
             Tuple of (percentile, z_score)
         """
-        if gender.lower() not in ['male', 'female']:
+        gender_key = gender.lower()
+        if gender_key not in ('male', 'female'):
             raise ValueError("Gender must be 'male' or 'female'")
-        
+
         if age_years < 2 or age_years > 19:
             raise ValueError("Age must be between 2 and 19 years")
-        
-        gender_data = cls.BMI_REFERENCE_DATA[gender.lower()]
-        ages = np.array(gender_data['ages'])
-        percentiles = ['p3', 'p5', 'p10', 'p25', 'p50', 'p75', 'p90', 'p95', 'p97']
-        
-        # Find closest age in reference data
-        age_idx = np.argmin(np.abs(ages - age_years))
-        reference_age = ages[age_idx]
-        
-        # Get BMI values for this age
-        bmi_values = [gender_data[p][age_idx] for p in percentiles]
-        
-        # Calculate percentile using interpolation
-        if bmi <= bmi_values[0]:  # Below 3rd percentile
-            percentile = 3.0 * (bmi / bmi_values[0])
-        elif bmi >= bmi_values[-1]:  # Above 97th percentile
-            percentile = 97.0 + (3.0 * (bmi - bmi_values[-1]) / bmi_values[-1])
+
+        # O(1) lookup in the dense precomputed table: the age grid is
+        # uniform, so the bracketing rows fall out of plain arithmetic.
+        # Blending the two rows keeps the cutoffs continuous in age — no
+        # category jumps at grid boundaries — and because the grid is
+        # itself piecewise-linear in the yearly reference data, this
+        # reproduces exact bilinear interpolation of the original table.
+        # With numba the whole lookup runs as a precompiled native kernel;
+        # otherwise the plain-tuple path below does the same math (at 9
+        # cutoffs, NumPy ufunc dispatch would cost more than it saves).
+        if _pct_kernel is not None:
+            percentile = _pct_kernel(_WHO_PCTL_TABLE[gender_key], age_years, bmi)
         else:
-            # Find the two percentiles to interpolate between
-            for i in range(len(bmi_values) - 1):
-                if bmi_values[i] <= bmi <= bmi_values[i + 1]:
-                    p1, p2 = float(percentiles[i][1:]), float(percentiles[i + 1][1:])
-                    bmi1, bmi2 = bmi_values[i], bmi_values[i + 1]
-                    percentile = p1 + (p2 - p1) * (bmi - bmi1) / (bmi2 - bmi1)
-                    break
+            rows = _WHO_PCTL_ROWS[gender_key]
+            pos = (age_years - _AGE_GRID_START) / _AGE_GRID_STEP
+            lo = min(max(int(pos), 0), len(rows) - 2)
+            w = min(max(pos - lo, 0.0), 1.0)
+            inv_w = 1.0 - w
+            row_lo = rows[lo]
+            row_hi = rows[lo + 1]
+
+            # Blend cutoffs lazily and interpolate between the
+            # bracketing percentile levels
+            prev = inv_w * row_lo[0] + w * row_hi[0]
+            if bmi <= prev:  # Below 3rd percentile
+                percentile = 3.0 * (bmi / prev)
             else:
-                percentile = 50.0  # Default to median
-        
-        # Calculate z-score (approximate)
-        # Using the relationship between percentile and z-score
-        if percentile <= 50:
-            z_score = -np.abs(np.percentile(np.random.standard_normal(10000), percentile))
-        else:
-            z_score = np.abs(np.percentile(np.random.standard_normal(10000), 100 - percentile))
-        
+                percentile = None
+                for k in range(1, len(_PCTL_LEVELS_SCALAR)):
+                    cur = inv_w * row_lo[k] + w * row_hi[k]
+                    if bmi < cur:
+                        p0 = _PCTL_LEVELS_SCALAR[k - 1]
+                        p1 = _PCTL_LEVELS_SCALAR[k]
+                        percentile = p0 + (p1 - p0) * (bmi - prev) / (cur - prev)
+                        break
+                    prev = cur
+                if percentile is None:  # Above 97th percentile
+                    percentile = 97.0 + (3.0 * (bmi - prev) / prev)
+
+
+        # Closed-form inverse normal CDF: deterministic and a few FLOPs,
+        # instead of sampling and sorting 10k normal draws per call. The
+        # percentile is clamped because the out-of-range extrapolations
+        # above can leave (0, 100), where the inverse CDF diverges.
+        z_score = float(_inv_norm_cdf(min(max(percentile, 0.01), 99.99) / 100.0))
+
         return percentile, z_score
     
+    @classmethod
+    def calculate_bmi_percentile_and_zscore_batch(
+            cls, ages: np.ndarray, bmis: np.ndarray,
+            genders: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized percentile/z-score calculation over many patients
+
+        Same math as the scalar method, applied per gender subgroup with
+        broadcast table lookups, so cohort reprocessing costs a handful of
+        array ops instead of N Python calls.
+
+        Args:
+            ages: Ages in years, shape (N,)
+            bmis: BMI values, shape (N,)
+            genders: 'male'/'female' strings, shape (N,)
+
+        Returns:
+            Tuple of (percentiles, z_scores) arrays, shape (N,)
+        """
+        ages = np.asarray(ages, dtype=np.float64)
+        bmis = np.asarray(bmis, dtype=np.float64)
+        genders = np.char.lower(np.asarray(genders, dtype=str))
+
+        if not np.isin(genders, ('male', 'female')).all():
+            raise ValueError("Gender must be 'male' or 'female'")
+        if ((ages < 2) | (ages > 19)).any():
+            raise ValueError("Age must be between 2 and 19 years")
+
+        percentiles = np.empty(ages.shape, dtype=np.float64)
+        for gender_key in ('male', 'female'):
+            mask = genders == gender_key
+            if not mask.any():
+                continue
+            table = _WHO_PCTL_TABLE[gender_key]
+            sub_ages = ages[mask]
+            sub_bmis = bmis[mask]
+
+            # Fused parallel kernel when numba is available: one pass,
+            # no (N, 9) blended-row temporaries
+            if _pct_kernel_batch is not None:
+                percentiles[mask] = _pct_kernel_batch(
+                    table, np.ascontiguousarray(sub_ages),
+                    np.ascontiguousarray(sub_bmis))
+                continue
+
+            # Bilinear age interpolation, broadcast over the subgroup
+            pos = (sub_ages - _AGE_GRID_START) / _AGE_GRID_STEP
+            lo = np.clip(pos.astype(np.int64), 0, len(_AGE_GRID) - 2)
+            w = np.clip(pos - lo, 0.0, 1.0)
+            rows = (1.0 - w)[:, None] * table[lo] + w[:, None] * table[lo + 1]
+
+            # Per-row bracket: cutoff rows are sorted, so counting the
+            # cutoffs at or below each BMI locates its interval
+            j = np.clip((rows <= sub_bmis[:, None]).sum(axis=1) - 1,
+                        0, rows.shape[1] - 2)
+            b0 = np.take_along_axis(rows, j[:, None], 1)[:, 0]
+            b1 = np.take_along_axis(rows, (j + 1)[:, None], 1)[:, 0]
+            p0 = _PCTL_LEVELS[j]
+            p1 = _PCTL_LEVELS[j + 1]
+            interior = p0 + (p1 - p0) * (sub_bmis - b0) / (b1 - b0)
+
+            low = rows[:, 0]
+            high = rows[:, -1]
+            percentiles[mask] = np.where(
+                sub_bmis <= low, 3.0 * (sub_bmis / low),
+                np.where(sub_bmis >= high,
+                         97.0 + 3.0 * (sub_bmis - high) / high,
+                         interior))
+
+        clamped = np.clip(percentiles, 0.01, 99.99) / 100.0
+        try:
+            z_scores = np.asarray(_inv_norm_cdf(clamped), dtype=np.float64)
+        except TypeError:  # stdlib inv_cdf fallback is scalar-only
+            z_scores = np.array([_inv_norm_cdf(p) for p in clamped])
+        return percentiles, z_scores
+
     @classmethod
     def get_bmi_category(cls, bmi: float, age_years: float, gender: str) -> str:
         """
@@ -108,9 +222,40 @@ class WHOStandards:
         Returns:
             BMI category string
         """
+        # Quantize to 0.01 so repeated lookups for near-identical inputs
+        # (same patient across views, report + PDF) hit the memo; 0.01 BMI
+        # is far below the category thresholds' sensitivity
+        return cls._bmi_category_cached(round(bmi, 2), round(age_years, 2),
+                                        gender.lower())
+
+    @classmethod
+    def get_bmi_category_batch(cls, ages: np.ndarray, bmis: np.ndarray,
+                               genders: np.ndarray) -> np.ndarray:
+        """
+        Vectorized BMI categories for many patients
+
+        One branchless searchsorted over the percentile thresholds instead
+        of a per-row if/elif ladder. Unlike the scalar method there is no
+        adult-standards fallback: inputs outside the supported age range
+        raise, matching calculate_bmi_percentile_and_zscore_batch.
+
+        Args:
+            ages: Ages in years, shape (N,)
+            bmis: BMI values, shape (N,)
+            genders: 'male'/'female' strings, shape (N,)
+
+        Returns:
+            Array of category strings, shape (N,)
+        """
+        percentiles, _ = cls.calculate_bmi_percentile_and_zscore_batch(ages, bmis, genders)
+        return _CATEGORY_LABELS[np.searchsorted(_CATEGORY_THRESH, percentiles, side='right')]
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _bmi_category_cached(cls, bmi: float, age_years: float, gender: str) -> str:
         try:
             percentile, z_score = cls.calculate_bmi_percentile_and_zscore(age_years, bmi, gender)
-            
+
             # WHO child/adolescent categories:
             # Underweight: <5th, Normal: 5th–<85th, Overweight: 85th–<97th, Obese: ≥97th
             if percentile < 5:
@@ -133,9 +278,143 @@ class WHOStandards:
                 return "Obese"
 
 
+def _build_pctl_table(gender_data: Dict[str, Any]) -> np.ndarray:
+    """Resample one gender's reference curves onto the dense age grid.
+
+    Returns a (len(_AGE_GRID), len(_PCTL_LEVELS)) matrix whose rows are the
+    BMI cutoffs for one age; building it takes microseconds at import, so
+    no on-disk cache is needed.
+    """
+    ages = np.asarray(gender_data['ages'], dtype=np.float64)
+    return np.column_stack([
+        np.interp(_AGE_GRID, ages,
+                  np.asarray(gender_data[f'p{int(level)}'], dtype=np.float64))
+        for level in _PCTL_LEVELS
+    ])
+
+
+_WHO_PCTL_TABLE = {
+    gender: _build_pctl_table(data)
+    for gender, data in WHOStandards.BMI_REFERENCE_DATA.items()
+}
+
+# Plain-tuple mirror of the table for the scalar fast path (no per-call
+# NumPy dispatch or array temporaries for 9-element rows)
+_WHO_PCTL_ROWS = {
+    gender: tuple(map(tuple, table))
+    for gender, table in _WHO_PCTL_TABLE.items()
+}
+
+try:
+    from numba import njit as _njit, prange as _prange, types as _nb_types
+
+    # Native percentile kernel over the dense table; eager signature so
+    # compilation happens at import (and is reused from the on-disk
+    # cache), not on the first prediction. Same math as the pure-Python
+    # fallback in calculate_bmi_percentile_and_zscore below.
+    @_njit(_nb_types.float64(
+        _nb_types.Array(_nb_types.float64, 2, 'C', readonly=True),
+        _nb_types.float64, _nb_types.float64),
+        cache=True)
+    def _pct_kernel(table, age_years, bmi):
+        pos = (age_years - _AGE_GRID_START) / _AGE_GRID_STEP
+        lo = int(pos)
+        if lo < 0:
+            lo = 0
+        elif lo > table.shape[0] - 2:
+            lo = table.shape[0] - 2
+        w = pos - lo
+        if w < 0.0:
+            w = 0.0
+        elif w > 1.0:
+            w = 1.0
+        inv_w = 1.0 - w
+
+        prev = inv_w * table[lo, 0] + w * table[lo + 1, 0]
+        if bmi <= prev:  # Below 3rd percentile
+            return 3.0 * (bmi / prev)
+        for k in range(1, table.shape[1]):
+            cur = inv_w * table[lo, k] + w * table[lo + 1, k]
+            if bmi < cur:
+                p0 = _PCTL_LEVELS[k - 1]
+                p1 = _PCTL_LEVELS[k]
+                return p0 + (p1 - p0) * (bmi - prev) / (cur - prev)
+            prev = cur
+        # Above 97th percentile
+        return 97.0 + (3.0 * (bmi - prev) / prev)
+
+    # Batched counterpart: one fused parallel pass per gender subgroup,
+    # instead of the NumPy broadcast chain that materializes (N, 9)
+    # temporaries for the blended rows and the bracket search
+    @_njit(_nb_types.float64[::1](
+        _nb_types.Array(_nb_types.float64, 2, 'C', readonly=True),
+        _nb_types.Array(_nb_types.float64, 1, 'C', readonly=True),
+        _nb_types.Array(_nb_types.float64, 1, 'C', readonly=True)),
+        cache=True, parallel=True)
+    def _pct_kernel_batch(table, ages, bmis):
+        out = np.empty(ages.size, dtype=np.float64)
+        for i in _prange(ages.size):
+            out[i] = _pct_kernel(table, ages[i], bmis[i])
+        return out
+except ImportError:  # pragma: no cover - numba is optional
+    _pct_kernel = None
+    _pct_kernel_batch = None
+
+
+# Risk-score binning tables: np.searchsorted against a sorted thresholds
+# array replaces the if/elif cascades below (branchless, and reusable for
+# batch scoring).  side= is chosen so each bin matches the original
+# strict/inclusive comparisons exactly.
+_BMI_PCT_THRESH = np.array([5.0, 10.0, 25.0, 85.0, 97.0])
+_BMI_PCT_PTS = np.array([40, 30, 20, 0, 25, 35])
+_Z_THRESH = np.array([1.0, 1.5, 2.0])
+_Z_PTS = np.array([0, 10, 15, 20])
+_LEVEL_THRESH = np.array([20, 40, 60])
+_LEVELS = ("Low", "Medium", "High", "Critical")
+_LEVELS_ARR = np.array(_LEVELS)
+
+# Canned recommendation texts, built once at import; generate_recommendations
+# only picks an index into these. Order: maintain / gain weight / lose weight
+_DIETARY = (
+    "Maintain balanced nutrition with variety. "
+    "Include all food groups: proteins, carbohydrates, healthy fats, "
+    "vitamins, and minerals. Focus on whole foods over processed options.",
+    "Increase caloric intake with nutrient-dense foods. "
+    "Focus on protein-rich foods, healthy fats, and complex carbohydrates. "
+    "Consider 5-6 small meals per day. Include dairy, eggs, lean meats, "
+    "nuts, and whole grains.",
+    "Focus on portion control and balanced nutrition. "
+    "Increase vegetables, fruits, and lean proteins. "
+    "Reduce processed foods, sugary drinks, and excessive fats. "
+    "Aim for regular meal timing and avoid skipping meals.",
+)
+
+# Order: maintain / moderate changes / immediate attention
+_LIFESTYLE = (
+    "Maintain healthy habits. Continue regular physical activity, "
+    "adequate sleep (8-10 hours), and balanced daily routines. "
+    "Monitor growth patterns regularly.",
+    "Moderate lifestyle changes needed. Increase physical activity to "
+    "60 minutes daily, improve sleep hygiene, and reduce sedentary behavior. "
+    "Establish regular routines.",
+    "Immediate attention required. Establish regular sleep patterns, "
+    "reduce screen time, and increase physical activity. "
+    "Consider stress management techniques and family counseling.",
+)
+
+# Order: routine / elevated risk
+_HYDRATION = (
+    "Maintain good hydration habits: 6-8 glasses of water daily. "
+    "Include water-rich foods like fruits and vegetables.",
+    "Ensure adequate hydration: 6-8 glasses of water daily. "
+    "Monitor urine color (should be light yellow). "
+    "Increase fluids during physical activity and hot weather.",
+)
+
+
 class MalnutritionRiskAssessment:
     """Calculate malnutrition risk score based on multiple factors"""
-    
+
     @staticmethod
     def calculate_risk_score(
         bmi_percentile: float,
@@ -161,28 +440,13 @@ class MalnutritionRiskAssessment:
         Returns:
             Dictionary with risk assessment results
         """
-        risk_score = 0
-        
-        # BMI-based risk (40 points)
-        if bmi_percentile < 5:
-            risk_score += 40  # Severe underweight
-        elif bmi_percentile < 10:
-            risk_score += 30  # Moderate underweight
-        elif bmi_percentile < 25:
-            risk_score += 20  # Mild underweight
-        elif bmi_percentile >= 97:
-            risk_score += 35  # Obese
-        elif bmi_percentile >= 85:
-            risk_score += 25  # Overweight
-        
+        # BMI-based risk (40 points): severe/moderate/mild underweight,
+        # normal, overweight, obese
+        risk_score = int(_BMI_PCT_PTS[np.searchsorted(_BMI_PCT_THRESH, bmi_percentile, side='right')])
+
         # Z-score risk (20 points)
-        if abs(bmi_z_score) > 2.0:
-            risk_score += 20
-        elif abs(bmi_z_score) > 1.5:
-            risk_score += 15
-        elif abs(bmi_z_score) > 1.0:
-            risk_score += 10
-        
+        risk_score += int(_Z_PTS[np.searchsorted(_Z_THRESH, abs(bmi_z_score))])
+
         # Skin health risk (20 points)
         if 'unhealthy' in skin_health:
             risk_score += int(20 * (1 - skin_confidence))  # Higher risk if low confidence
@@ -205,15 +469,8 @@ class MalnutritionRiskAssessment:
         risk_score = min(100, risk_score)
         
         # Determine risk level
-        if risk_score < 20:
-            risk_level = "Low"
-        elif risk_score < 40:
-            risk_level = "Medium"
-        elif risk_score < 60:
-            risk_level = "High"
-        else:
-            risk_level = "Critical"
-        
+        risk_level = _LEVELS[np.searchsorted(_LEVEL_THRESH, risk_score, side='right')]
+
         return {
             'risk_score': risk_score,
             'risk_level': risk_level,
@@ -223,6 +480,67 @@ class MalnutritionRiskAssessment:
             'nail_risk': min(20, risk_score)
         }
     
+    @staticmethod
+    def calculate_risk_score_batch(
+            bmi_percentiles: np.ndarray,
+            bmi_z_scores: np.ndarray,
+            skin_healths: np.ndarray,
+            nail_healths: np.ndarray,
+            skin_confidences: np.ndarray,
+            nail_confidences: np.ndarray,
+            ages_years: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized risk scoring over many patients
+
+        Same point tables and truncation behavior as the scalar method,
+        applied with searchsorted/where over whole arrays; returns the
+        same keys with array values.
+
+        Args:
+            bmi_percentiles: WHO BMI percentiles, shape (N,)
+            bmi_z_scores: WHO BMI z-scores, shape (N,)
+            skin_healths: skin prediction labels, shape (N,)
+            nail_healths: nail prediction labels, shape (N,)
+            skin_confidences: skin confidence scores, shape (N,)
+            nail_confidences: nail confidence scores, shape (N,)
+            ages_years: ages in years, shape (N,)
+
+        Returns:
+            Dictionary with risk assessment result arrays
+        """
+        bmi_percentiles = np.asarray(bmi_percentiles, dtype=np.float64)
+        bmi_z_scores = np.asarray(bmi_z_scores, dtype=np.float64)
+        skin_confidences = np.asarray(skin_confidences, dtype=np.float64)
+        nail_confidences = np.asarray(nail_confidences, dtype=np.float64)
+        ages_years = np.asarray(ages_years, dtype=np.float64)
+
+        scores = _BMI_PCT_PTS[np.searchsorted(_BMI_PCT_THRESH, bmi_percentiles, side='right')]
+        scores = scores + _Z_PTS[np.searchsorted(_Z_THRESH, np.abs(bmi_z_scores))]
+
+        # astype truncates toward zero like the scalar int() casts
+        skin_unhealthy = np.char.find(np.asarray(skin_healths, dtype=str), 'unhealthy') >= 0
+        nail_unhealthy = np.char.find(np.asarray(nail_healths, dtype=str), 'unhealthy') >= 0
+        scores = scores + np.where(skin_unhealthy,
+                                   (20 * (1 - skin_confidences)).astype(np.int64),
+                                   (5 * (1 - skin_confidences)).astype(np.int64))
+        scores = scores + np.where(nail_unhealthy,
+                                   (20 * (1 - nail_confidences)).astype(np.int64),
+                                   (5 * (1 - nail_confidences)).astype(np.int64))
+
+        scores = np.where(ages_years < 5, (scores * 1.2).astype(np.int64),
+                          np.where(ages_years > 15, (scores * 1.1).astype(np.int64),
+                                   scores))
+        scores = np.minimum(100, scores)
+
+        return {
+            'risk_score': scores,
+            'risk_level': _LEVELS_ARR[np.searchsorted(_LEVEL_THRESH, scores, side='right')],
+            'bmi_risk': np.minimum(40, scores),
+            'z_score_risk': np.minimum(20, scores),
+            'skin_risk': np.minimum(20, scores),
+            'nail_risk': np.minimum(20, scores)
+        }
+
     @staticmethod
     def generate_recommendations(risk_assessment: Dict[str, Any], bmi_category: str) -> Dict[str, str]:
         """
@@ -235,70 +553,35 @@ class MalnutritionRiskAssessment:
         Returns:
             Dictionary with recommendations
         """
-        risk_level = risk_assessment['risk_level']
         risk_score = risk_assessment['risk_score']
-        
-        # Dietary recommendations
-        if bmi_category == "Underweight":
-            dietary = (
-                "Increase caloric intake with nutrient-dense foods. "
-                "Focus on protein-rich foods, healthy fats, and complex carbohydrates. "
-                "Consider 5-6 small meals per day. Include dairy, eggs, lean meats, "
-                "nuts, and whole grains."
-            )
-        elif bmi_category == "Overweight" or bmi_category == "Obese":
-            dietary = (
-                "Focus on portion control and balanced nutrition. "
-                "Increase vegetables, fruits, and lean proteins. "
-                "Reduce processed foods, sugary drinks, and excessive fats. "
-                "Aim for regular meal timing and avoid skipping meals."
-            )
-        else:
-            dietary = (
-                "Maintain balanced nutrition with variety. "
-                "Include all food groups: proteins, carbohydrates, healthy fats, "
-                "vitamins, and minerals. Focus on whole foods over processed options."
-            )
-        
-        # Lifestyle recommendations
-        if risk_score > 60:
-            lifestyle = (
-                "Immediate attention required. Establish regular sleep patterns, "
-                "reduce screen time, and increase physical activity. "
-                "Consider stress management techniques and family counseling."
-            )
-        elif risk_score > 40:
-            lifestyle = (
-                "Moderate lifestyle changes needed. Increase physical activity to "
-                "60 minutes daily, improve sleep hygiene, and reduce sedentary behavior. "
-                "Establish regular routines."
-            )
-        else:
-            lifestyle = (
-                "Maintain healthy habits. Continue regular physical activity, "
-                "adequate sleep (8-10 hours), and balanced daily routines. "
-                "Monitor growth patterns regularly."
-            )
-        
-        # Hydration tips
-        if risk_score > 50:
-            hydration = (
-                "Ensure adequate hydration: 6-8 glasses of water daily. "
-                "Monitor urine color (should be light yellow). "
-                "Increase fluids during physical activity and hot weather."
-            )
-        else:
-            hydration = (
-                "Maintain good hydration habits: 6-8 glasses of water daily. "
-                "Include water-rich foods like fruits and vegetables."
-            )
-        
-        # Professional consultation recommendation
-        professional_consultation = risk_score > 40 or bmi_category in ["Underweight", "Obese"]
-        
+
+        # The recommendation text only depends on which score thresholds are
+        # crossed (>40, >50, >60) and the BMI category, so collapse the score
+        # into a bucket and memoize the text assembly per (bucket, category)
+        risk_bucket = (
+            (risk_score > 60) * 4 + (risk_score > 50) * 2 + (risk_score > 40)
+        )
+        dietary, lifestyle, hydration, consult = \
+            MalnutritionRiskAssessment._recommendations_cached(risk_bucket, bmi_category)
+
         return {
             'dietary_recommendations': dietary,
             'lifestyle_recommendations': lifestyle,
             'hydration_tips': hydration,
-            'professional_consultation': professional_consultation
+            'professional_consultation': consult
         }
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _recommendations_cached(risk_bucket: int, bmi_category: str) -> Tuple[str, str, str, bool]:
+        # Select from the module-level text constants: maintain / gain / lose
+        diet = (1 if bmi_category == "Underweight"
+                else 2 if bmi_category in ("Overweight", "Obese")
+                else 0)
+        # maintain / moderate changes / immediate attention
+        lifestyle = 2 if risk_bucket & 4 else 1 if risk_bucket & 1 else 0
+        hydration = 1 if risk_bucket & 2 else 0
+        professional_consultation = bool(risk_bucket & 1) or bmi_category in ("Underweight", "Obese")
+
+        return (_DIETARY[diet], _LIFESTYLE[lifestyle], _HYDRATION[hydration],
+                professional_consultation)
@@ -1,5 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import joinedload
 from ..models.patient import Patient
 from ..models.report import Report
 from ..extensions import db
@@ -8,12 +10,55 @@ from ..extensions import db
 reports_bp = Blueprint("reports", __name__, url_prefix="/reports")
 
 
+REPORTS_PER_PAGE = 50
+
+
 @reports_bp.route("/")
 @login_required
 def list_reports():
-    patient_ids = [p.id for p in Patient.query.filter_by(user_id=current_user.id).all()]
-    reports = Report.query.filter(Report.patient_id.in_(patient_ids)).order_by(Report.created_at.desc()).all()
-    return render_template("reports/list.html", reports=reports)
+    page = max(request.args.get("page", 1, type=int), 1)
+
+    # Single JOIN instead of fetching the user's patient ids first and
+    # pushing them back in an IN (...) list; joinedload hydrates each
+    # report's patient in the same round-trip for the template, and
+    # limit/offset bounds memory and page size for power users
+    stmt = (
+        select(Report)
+        .join(Patient, Report.patient_id == Patient.id)
+        .where(Patient.user_id == current_user.id)
+        .order_by(Report.created_at.desc())
+        .options(joinedload(Report.patient))
+        .limit(REPORTS_PER_PAGE)
+        .offset((page - 1) * REPORTS_PER_PAGE)
+        .execution_options(yield_per=REPORTS_PER_PAGE)
+    )
+    reports = db.session.execute(stmt).scalars().all()
+
+    # Quick-stats totals over the whole history in one aggregate query,
+    # instead of having the template count a fully materialized list
+    at_risk = ("At Risk", "Moderate", "Severe")
+    stats = db.session.execute(
+        select(
+            func.count(Report.id),
+            func.sum(case((Report.nutrition_status == "Normal", 1), else_=0)),
+            func.sum(case((Report.nutrition_status.in_(at_risk), 1), else_=0)),
+            func.count(func.distinct(Report.patient_id)),
+        )
+        .join(Patient, Report.patient_id == Patient.id)
+        .where(Patient.user_id == current_user.id)
+    ).one()
+    total_reports = stats[0] or 0
+
+    return render_template(
+        "reports/list.html",
+        reports=reports,
+        page=page,
+        has_next=page * REPORTS_PER_PAGE < total_reports,
+        total_reports=total_reports,
+        normal_count=stats[1] or 0,
+        at_risk_count=stats[2] or 0,
+        patient_count=stats[3] or 0,
+    )
 
 
 @reports_bp.route("/<int:report_id>/delete", methods=["POST"])
@@ -28,6 +73,8 @@ def delete_report(report_id: int):
     try:
         db.session.delete(report)
         db.session.commit()
+        from ..dashboard.routes import invalidate_status_cache
+        invalidate_status_cache(current_user.id)
         flash("Report deleted.", "success")
     except Exception as e:
         db.session.rollback()
@@ -14,6 +14,65 @@ from app import create_app
 from app.extensions import db
 from sqlalchemy import text
 
+# Tables whose foreign keys carry ON DELETE actions in the models; older
+# databases were created without them
+_FK_ACTION_TABLES = ('reports', 'reminders')
+
+
+def _rebuild_sqlite_fk_actions():
+    """Install the models' ON DELETE actions on pre-existing SQLite tables.
+
+    SQLite cannot alter a foreign key in place, so any table created
+    before the cascade change is rebuilt with the documented copy-rename
+    dance: create the table from the current model schema under a
+    temporary name, copy the rows across, swap the tables, and recreate
+    the indexes. Without this, deleting a patient with reports (or a
+    report with reminders) fails the plain FOREIGN KEY constraint once
+    the foreign_keys pragma is on.
+    """
+    from sqlalchemy.schema import CreateTable, CreateIndex
+
+    for table_name in _FK_ACTION_TABLES:
+        table = db.metadata.tables[table_name]
+        # Driver-level autocommit: the foreign_keys pragma is a no-op
+        # inside a transaction, so the rebuild manages its own
+        # BEGIN/COMMIT around the copy-rename
+        with db.engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT") as conn:
+            current_ddl = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type='table' AND name=?",
+                (table_name,),
+            ).scalar()
+            if not current_ddl or 'ON DELETE' in current_ddl.upper():
+                print(f"Foreign key actions already present: {table_name}")
+                continue
+
+            print(f"Rebuilding table with ON DELETE actions: {table_name}")
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            conn.exec_driver_sql("BEGIN")
+            try:
+                create = str(CreateTable(table).compile(db.engine)).replace(
+                    f"CREATE TABLE {table_name}",
+                    f"CREATE TABLE _new_{table_name}", 1)
+                conn.exec_driver_sql(create)
+                columns = ", ".join(c.name for c in table.columns)
+                conn.exec_driver_sql(
+                    f"INSERT INTO _new_{table_name} ({columns}) "
+                    f"SELECT {columns} FROM {table_name}")
+                conn.exec_driver_sql(f"DROP TABLE {table_name}")
+                conn.exec_driver_sql(
+                    f"ALTER TABLE _new_{table_name} RENAME TO {table_name}")
+                for index in table.indexes:
+                    conn.exec_driver_sql(str(CreateIndex(index).compile(db.engine)))
+                conn.exec_driver_sql("COMMIT")
+            except Exception:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            finally:
+                conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+            print(f"✓ Rebuilt table: {table_name}")
+
+
 def migrate_database():
     """Migrate the database to add new fields"""
     app = create_app()
@@ -40,21 +99,57 @@ def migrate_database():
                 ('dietary_recommendations', 'TEXT'),
                 ('lifestyle_recommendations', 'TEXT'),
                 ('hydration_tips', 'TEXT'),
-                ('professional_consultation', 'BOOLEAN')
+                ('professional_consultation', 'BOOLEAN'),
+                ('created_at_ymd', 'VARCHAR(8)')
             ]
             
-            # Add new columns if they don't exist
-            for column_name, column_type in new_columns:
-                if column_name not in existing_columns:
-                    print(f"Adding column: {column_name}")
-                    sql = f"ALTER TABLE reports ADD COLUMN {column_name} {column_type}"
-                    db.session.execute(text(sql))
-                    print(f"✓ Added column: {column_name}")
-                else:
+            # Work out which columns are actually missing
+            missing_columns = [
+                (name, col_type) for name, col_type in new_columns
+                if name not in existing_columns
+            ]
+            for column_name, _ in new_columns:
+                if column_name in existing_columns:
                     print(f"Column already exists: {column_name}")
-            
-            # Commit changes
-            db.session.commit()
+
+            # One transaction for all DDL: a single multi-clause ALTER on
+            # dialects that support it (Postgres/MySQL), and one ALTER per
+            # column on SQLite (which allows only one ADD COLUMN at a
+            # time) — either way the migration is atomic on failure
+            with db.engine.begin() as conn:
+                if missing_columns:
+                    if db.engine.dialect.name in ('postgresql', 'mysql'):
+                        clauses = ", ".join(
+                            f"ADD COLUMN {name} {col_type}"
+                            for name, col_type in missing_columns
+                        )
+                        conn.execute(text(f"ALTER TABLE reports {clauses}"))
+                        for column_name, _ in missing_columns:
+                            print(f"✓ Added column: {column_name}")
+                    else:
+                        for column_name, column_type in missing_columns:
+                            print(f"Adding column: {column_name}")
+                            conn.execute(text(
+                                f"ALTER TABLE reports ADD COLUMN {column_name} {column_type}"
+                            ))
+                            print(f"✓ Added column: {column_name}")
+
+                # Composite index backing reports-by-patient listings
+                # ordered by date (declared on the model for fresh
+                # databases)
+                print("Ensuring index: ix_reports_patient_created")
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_reports_patient_created "
+                    "ON reports (patient_id, created_at)"
+                ))
+                print("✓ Index ensured: ix_reports_patient_created")
+
+            # SQLite tables from before the cascade change need a
+            # rebuild to pick up the ON DELETE actions (runs after the
+            # column adds so the old and new schemas line up)
+            if db.engine.dialect.name == 'sqlite':
+                _rebuild_sqlite_fk_actions()
+
             print("\n✓ Database migration completed successfully!")
             
             # Show final table structure
@@ -90,20 +185,30 @@ def rollback_migration():
                 'dietary_recommendations',
                 'lifestyle_recommendations',
                 'hydration_tips',
-                'professional_consultation'
+                'professional_consultation',
+                'created_at_ymd'
             ]
             
-            # Remove columns
+            # Inspect up front instead of trying each DROP and catching
+            # errors, so the whole rollback can run in one transaction
+            inspector = db.inspect(db.engine)
+            existing_columns = [col['name'] for col in inspector.get_columns('reports')]
+            present = [c for c in columns_to_remove if c in existing_columns]
             for column_name in columns_to_remove:
-                try:
-                    sql = f"ALTER TABLE reports DROP COLUMN {column_name}"
-                    db.session.execute(text(sql))
-                    print(f"✓ Removed column: {column_name}")
-                except Exception as e:
-                    print(f"Column {column_name} may not exist: {e}")
-            
-            # Commit changes
-            db.session.commit()
+                if column_name not in present:
+                    print(f"Column does not exist: {column_name}")
+
+            with db.engine.begin() as conn:
+                if present and db.engine.dialect.name in ('postgresql', 'mysql'):
+                    clauses = ", ".join(f"DROP COLUMN {c}" for c in present)
+                    conn.execute(text(f"ALTER TABLE reports {clauses}"))
+                    for column_name in present:
+                        print(f"✓ Removed column: {column_name}")
+                else:
+                    for column_name in present:
+                        conn.execute(text(f"ALTER TABLE reports DROP COLUMN {column_name}"))
+                        print(f"✓ Removed column: {column_name}")
+
             print("\n✓ Rollback completed successfully!")
             
         except Exception as e:
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script for Query Indexes
+Adds composite indexes used by the dashboard's "latest report per patient"
+and upcoming-reminders queries
+"""
+
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.extensions import db
+from sqlalchemy import text
+
+# Index name -> CREATE INDEX statement
+INDEXES = {
+    'ix_reports_patient_created':
+        'CREATE INDEX IF NOT EXISTS ix_reports_patient_created '
+        'ON reports (patient_id, created_at)',
+    'ix_reminders_user_date_completed':
+        'CREATE INDEX IF NOT EXISTS ix_reminders_user_date_completed '
+        'ON reminders (user_id, reminder_date, is_completed)',
+}
+
+def migrate_indexes():
+    """Create the composite indexes if they don't exist yet"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            for index_name, sql in INDEXES.items():
+                db.session.execute(text(sql))
+                print(f"✓ Ensured index: {index_name}")
+
+            db.session.commit()
+            print("\n✓ Index migration completed successfully!")
+
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            db.session.rollback()
+            return False
+
+    return True
+
+def rollback_indexes():
+    """Drop the composite indexes"""
+    app = create_app()
+
+    with app.app_context():
+        try:
+            for index_name in INDEXES:
+                db.session.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+                print(f"✓ Dropped index: {index_name}")
+
+            db.session.commit()
+            print("\n✓ Rollback completed successfully!")
+
+        except Exception as e:
+            print(f"❌ Rollback failed: {e}")
+            db.session.rollback()
+            return False
+
+    return True
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Database migration for dashboard query indexes')
+    parser.add_argument('--rollback', action='store_true', help='Rollback the migration')
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        print("Rolling back index migration...")
+        success = rollback_indexes()
+    else:
+        print("Running index migration...")
+        success = migrate_indexes()
+
+    if success:
+        print("\n🎉 Operation completed successfully!")
+        sys.exit(0)
+    else:
+        print("\n💥 Operation failed!")
+        sys.exit(1)
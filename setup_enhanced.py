@@ -8,6 +8,7 @@ import os
 import sys
 import subprocess
 import shutil
+from importlib.util import find_spec
 
 def print_header():
     """Print setup header"""
@@ -29,22 +30,28 @@ def check_python_version():
 def check_dependencies():
     """Check if required packages are installed"""
     print("\n📦 Checking dependencies...")
-    
+
+    # (display name, import name) pairs; find_spec only probes the
+    # installed metadata, so checking tensorflow does not pay its
+    # multi-second import here
     required_packages = [
-        'flask', 'tensorflow', 'numpy', 'matplotlib', 
-        'seaborn', 'pillow', 'scikit-learn'
+        ('flask', 'flask'),
+        ('tensorflow', 'tensorflow'),
+        ('numpy', 'numpy'),
+        ('matplotlib', 'matplotlib'),
+        ('pillow', 'PIL'),
+        ('scikit-learn', 'sklearn'),
     ]
-    
+
     missing_packages = []
-    
-    for package in required_packages:
-        try:
-            __import__(package)
+
+    for package, module_name in required_packages:
+        if find_spec(module_name) is not None:
             print(f"✅ {package}")
-        except ImportError:
+        else:
             print(f"❌ {package} - Missing")
             missing_packages.append(package)
-    
+
     if missing_packages:
         print(f"\n⚠️ Missing packages: {', '.join(missing_packages)}")
         print("Run: pip install -r requirements.txt")
@@ -68,22 +75,19 @@ def setup_directories():
         print(f"✅ Created: {directory}")
 
 def run_database_migration():
-    """Run database migration"""
+    """Run database migration in-process (no second interpreter startup)"""
     print("\n🗄️ Running database migration...")
-    
+
     try:
-        result = subprocess.run([
-            sys.executable, 'scripts/migrate_database.py'
-        ], capture_output=True, text=True, cwd=os.getcwd())
-        
-        if result.returncode == 0:
+        from scripts.migrate_database import migrate_database
+
+        if migrate_database():
             print("✅ Database migration completed successfully")
             return True
         else:
-            print("❌ Database migration failed:")
-            print(result.stderr)
+            print("❌ Database migration failed")
             return False
-            
+
     except Exception as e:
         print(f"❌ Error running migration: {e}")
         return False